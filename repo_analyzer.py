@@ -21,8 +21,10 @@ Documentation: https://docs.example.com/repo-analyzer
 Dependencies:
     - requests>=2.31.0
     - openai>=1.0.0
-    - toml>=0.10.2
+    - toml>=0.10.2 (only used on Python < 3.11, which lacks tomllib)
     - PyYAML>=6.0
+    - orjson>=3.8 (optional, faster JSON for large GitHub responses)
+    - pyahocorasick>=2.0 (optional, faster priority-pattern matching on large trees)
     - pathlib (built-in)
 
 Environment Variables Required:
@@ -61,21 +63,57 @@ License:
     SOFTWARE.
 """
 
-import requests
+from __future__ import annotations
+
+# Kept at module level: its JSONDecodeError is caught throughout, and orjson
+# imports it anyway because orjson.JSONDecodeError subclasses it
 import json
 import sys
 import os
-import base64
-import toml
-import yaml
+import codecs
+import collections
+import copy
+import functools
+import hashlib
+import io
+import heapq
+import math
+import sqlite3
+import tarfile
+import importlib.metadata
+import importlib.util
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
+import signal
+import tempfile
+import threading
 import time
 import re
+import types
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Union, Tuple
+from typing import TYPE_CHECKING, Dict, Any, List, Mapping, NoReturn, Optional, Union, Tuple
 from datetime import datetime
+from enum import IntEnum
 from urllib.parse import urlparse
-import openai
+
+if TYPE_CHECKING:
+    import requests
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib json module
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:  # Optional: falls back to a precompiled regex
+    ahocorasick = None
 
 # Version information
 __version__ = "1.0.0"
@@ -83,6 +121,21 @@ __author__ = "SrinathAkkem/Black Duck Software"
 __email__ = "reddyakkem@blackduck.com"
 __license__ = "MIT"
 
+# Public API for library use. Everything is defined in this one module, so there
+# is nothing to load lazily via a module __getattr__ (PEP 562); the heavy
+# third-party imports (requests, openai) are already deferred to first use
+__all__ = [
+    'Constants',
+    'RepositoryAnalyzerError',
+    'GitHubAPIError',
+    'AIModelError',
+    'ConfigurationError',
+    'UniversalRepoAnalyzer',
+    'validate_environment',
+    'ExitCode',
+    'main',
+]
+
 # Centralized constants for all hardcoded values
 class Constants:
     """
@@ -101,26 +154,34 @@ class Constants:
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     LOG_FILE_PREFIX = 'repo_analyzer_'
     TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S'
-    MAX_LOG_FILE_SIZE_MB = 50  # Maximum log file size in MB
     
     # GitHub API configuration
     GITHUB_TOKEN_ENV = 'GITHUB_TOKEN'
     GITHUB_API_BASE = 'https://api.github.com/repos'
-    GITHUB_TREE_ENDPOINT = '/git/trees/HEAD?recursive=1'
-    GITHUB_CONTENTS_ENDPOINT = '/contents'
+    GITHUB_TREE_ENDPOINT = '/git/trees/{ref}?recursive=1'
+    GITHUB_COMMITS_ENDPOINT = '/commits'
+    GITHUB_BLOBS_ENDPOINT = '/git/blobs'
+    GITHUB_RAW_MEDIA_TYPE = 'application/vnd.github.raw'  # Blob bytes as the response body
+    GITHUB_GRAPHQL_URL = 'https://api.github.com/graphql'
+    GITHUB_GRAPHQL_BATCH_SIZE = 50  # Blobs requested per GraphQL query (stays well inside query complexity limits)
+    GITHUB_GRAPHQL_MIN_BATCH_SIZE = 10  # Smallest batch worth a separate concurrent query
+    GITHUB_TARBALL_ENDPOINT = '/tarball/{ref}'
+    TARBALL_MAX_REPO_SIZE_KB = 50 * 1024  # Largest repository (GitHub 'size', KB) fetched as one archive
+    TARBALL_MIN_FILES = 10  # Fewest uncached files for which one archive beats per-blob requests
     GITHUB_API_TIMEOUT = 30  # Timeout for GitHub API calls in seconds
     GITHUB_RATE_LIMIT_BUFFER = 10  # Buffer for rate limit (requests remaining)
+    GITHUB_MAX_CONCURRENT_REQUESTS = 8  # Parallel file content downloads
+    GITHUB_MAX_RATE_LIMIT_WAIT = 60  # Longest pause (seconds) before letting a request run into the limit
+    GITHUB_HTTP_HOST_POOLS = 4  # Distinct hosts the shared session keeps connection pools for
+    GITHUB_HTTP_RETRIES = 3  # Transport-level retries for connection errors and 502/503/504
+    GITHUB_RETRY_ATTEMPTS = 3  # Application-level attempts per request (timeouts, rate limits)
+    GITHUB_BACKOFF_BASE = 1.0  # Seconds; full-jitter backoff is uniform(0, min(cap, base * 2**attempt))
+    GITHUB_BACKOFF_CAP = 30.0  # Upper bound in seconds for a single backoff sleep
     
     # AI API configuration - Single key for all providers
     AI_API_KEY_ENV = 'AI_API_KEY'
 
     BASE_URL = 'https://llm.labs.blackduck.com'
-    API_BASE_URLS = {
-        'claude': BASE_URL,
-        'gpt': BASE_URL,
-        'gemini': BASE_URL
-    }
-    API_BASE_URL_ENV_PREFIX = '_API_BASE_URL'
     MODEL_NAME_MAP = {
         'claude-sonnet': 'anthropic.claude-3-7-sonnet-20250219-v1:0',
         'claude-opus': 'anthropic.claude-opus-4-20250514-v1:0',
@@ -133,16 +194,29 @@ class Constants:
     }
     DEFAULT_MODEL = 'claude-sonnet'
     AI_TEMPERATURE = 0.2
-    AI_MAX_TOKENS = 4000
     AI_MAX_RETRIES = 3
     AI_RETRY_DELAY = 2  # Base delay between retries in seconds
-    AI_REQUEST_TIMEOUT = 60  # Timeout for AI API calls in seconds
+    AI_RETRY_DELAY_CAP = 30  # Upper bound in seconds; retries use decorrelated jitter, uniform(base, prev * 3)
+    AI_MEMO_MAX_ENTRIES = 64  # Responses kept in memory to answer identical repeat calls
+    
+    # Semantic cache for repeatable AI calls (file selection, structure analysis)
+    SEMANTIC_CACHE_PATH = '~/.repo_analyzer/semcache.db'
+    SEMANTIC_CACHE_EMBEDDING_MODEL = 'text-embedding-3-small'
+    SEMANTIC_CACHE_THRESHOLD = 0.9  # Minimum cosine similarity for a semantic hit
+    SEMANTIC_CACHE_MAX_EMBED_CHARS = 24000  # Prompt prefix embedded (~6k tokens)
     
     # File processing limits
     DEFAULT_MAX_FILES_TO_ANALYZE = 50
     DEFAULT_MAX_FILE_SIZE = 10000  # Characters, not bytes
-    MAX_FILES_IN_PROMPT = 200
+    PROMPT_FILE_LIST_TOKEN_BUDGET = 2500  # Estimated tokens for a file listing (~200 typical paths)
+    PROMPT_CHARS_PER_TOKEN = 3  # Conservative for file paths, which tokenize worse than prose
     MAX_TOTAL_CONTENT_SIZE = 100000  # Maximum total content size for AI analysis
+    MAX_FETCHABLE_FILE_SIZE = 1024 * 1024  # Bytes; larger blobs are skipped without a request
+    BINARY_SNIFF_BYTES = 8192  # Leading bytes checked for NUL to detect binary files
+    
+    # On-disk cache for immutable GitHub data (trees and blobs keyed by SHA)
+    DEFAULT_CACHE_DIR = '~/.repo_analyzer/cache'
+    CACHE_MAX_SIZE_MB = 500  # Least recently used entries are evicted beyond this
     
     # Default configuration values
     DEFAULT_CONFIG = {
@@ -163,7 +237,15 @@ class Constants:
         ],
         'excluded_file_extensions': [
             '.log', '.tmp', '.cache', '.lock', '.map', '.min.js', '.min.css'
-        ]
+        ],
+        'enable_cache': True,
+        'cache_dir': DEFAULT_CACHE_DIR,
+        # Replay a parsed AI analysis for a byte-identical prompt instead of asking
+        # the model again; set to False to always get a fresh answer
+        'enable_ai_cache': True,
+        'enable_semantic_cache': False,
+        'semantic_cache_threshold': SEMANTIC_CACHE_THRESHOLD,
+        'semantic_cache_embedding_model': SEMANTIC_CACHE_EMBEDDING_MODEL
     }
     
     # File selection patterns for fallback (ordered by priority)
@@ -193,675 +275,221 @@ class Constants:
         '.dockerfile', '.makefile'
     }
 
-# Initialize logging with proper configuration
-def setup_logging() -> str:
+# Accepts https://github.com/owner/repo[.git][/], git@github.com:owner/repo[.git] and owner/repo
+_GH_URL_RE = re.compile(
+    r'^(?:https?://github\.com/|git@github\.com:)?([a-zA-Z0-9._-]+)/([a-zA-Z0-9._-]+?)(?:\.git)?/*$'
+)
+
+def _format_file_list(file_paths: List[str]) -> Tuple[str, int]:
     """
-    Set up logging configuration with both console and file handlers.
-    
+    Render file paths as a "- path" list that fits the prompt token budget.
+
+    Args:
+        file_paths (List[str]): Paths in the order they should be listed
+
     Returns:
-        str: Path to the log file created
-        
+        Tuple[str, int]: The list text and how many paths it includes
+
     Note:
-        Creates timestamped log files to avoid conflicts in concurrent runs.
+        Tokens are estimated from characters (PROMPT_CHARS_PER_TOKEN) so that
+        long paths in deep monorepos cannot overflow the prompt, while short
+        paths are not cut off at an arbitrary count.
     """
-    timestamp = datetime.now().strftime(Constants.TIMESTAMP_FORMAT)
-    log_filename = f"{Constants.LOG_FILE_PREFIX}{timestamp}.log"
-    
-    # Create logs directory if it doesn't exist
-    log_dir = Path('logs')
-    log_dir.mkdir(exist_ok=True)
-    log_path = log_dir / log_filename
-    
-    # Configure logging with detailed format
-    logging.basicConfig(
-        level=getattr(logging, Constants.LOG_LEVEL),
-        format=Constants.LOG_FORMAT,
-        handlers=[
-            logging.StreamHandler(sys.stdout),  # Console output
-            logging.FileHandler(log_path, encoding='utf-8')  # File output
-        ]
-    )
-    
-    # Set third-party library log levels to reduce noise
-    logging.getLogger('requests').setLevel(logging.WARNING)
-    logging.getLogger('urllib3').setLevel(logging.WARNING)
-    logging.getLogger('openai').setLevel(logging.WARNING)
-    
-    return str(log_path)
+    char_budget = Constants.PROMPT_FILE_LIST_TOKEN_BUDGET * Constants.PROMPT_CHARS_PER_TOKEN
+    shown = 0
+    for file_path in file_paths:
+        # Each line costs the path plus its "- " prefix and newline
+        char_budget -= len(file_path) + 3
+        if char_budget < 0:
+            break
+        shown += 1
+    if not shown:
+        return "", 0
+    return "- " + "\n- ".join(file_paths[:shown]), shown
+
+
+# Placeholders recognized in custom_prompt_template
+_PLACEHOLDER_RE = re.compile(
+    r'\{(REPO_NAME|DESCRIPTION|LANGUAGE|TOPICS|TOTAL_FILES|FILE_STRUCTURE|'
+    r'FILE_CONTENTS|STRUCTURE_ANALYSIS|COMMAND_CATEGORIES)\}'
+)
+
+# Delimiter line around each file in the analysis prompt
+_FILE_SEPARATOR = '=' * 60
+
+# Matches any PRIORITY_PATTERNS entry anywhere in a lowercased path. Matching
+# lowercased text is several times faster than re.IGNORECASE for this union.
+_PRIORITY_PATTERNS_LOWER = tuple(pattern.lower() for pattern in Constants.PRIORITY_PATTERNS)
+_PRIORITY_RE = re.compile('|'.join(map(re.escape, _PRIORITY_PATTERNS_LOWER)))
+
+
+def _build_priority_automaton() -> Any:
+    """
+    Build an Aho-Corasick automaton over the lowercased PRIORITY_PATTERNS.
 
-# Initialize logger
-log_file_path = setup_logging()
-logger = logging.getLogger(__name__)
+    Returns:
+        Any: Automaton yielding each pattern's first index, or None when
+        pyahocorasick is not installed
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for i, pattern in enumerate(_PRIORITY_PATTERNS_LOWER):
+        # Lowercasing folds 'Makefile' into 'makefile'; keep the earlier index
+        if pattern not in automaton:
+            automaton.add_word(pattern, i)
+    automaton.make_automaton()
+    return automaton
 
-class RepositoryAnalyzerError(Exception):
-    """Base exception class for repository analyzer errors."""
-    pass
 
-class GitHubAPIError(RepositoryAnalyzerError):
-    """Exception raised for GitHub API related errors."""
-    pass
+_PRIORITY_AUTOMATON = _build_priority_automaton()
 
-class AIModelError(RepositoryAnalyzerError):
-    """Exception raised for AI model related errors."""
-    pass
 
-class ConfigurationError(RepositoryAnalyzerError):
-    """Exception raised for configuration related errors."""
-    pass
+def _priority_rank(file_path: str) -> int:
+    """
+    Find the first PRIORITY_PATTERNS entry contained in a path.
 
-class UniversalRepoAnalyzer:
+    Args:
+        file_path (str): File path to rank
+
+    Returns:
+        int: Index of the first matching pattern (case-insensitive), or
+        len(PRIORITY_PATTERNS) if none matches
     """
-    Universal Repository Analyzer using AI for comprehensive project analysis.
-    
-    This class provides functionality to:
-    1. Fetch repository structure and content from GitHub
-    2. Analyze project architecture using AI models
-    3. Generate build commands and development workflows
-    4. Handle various project types including monorepos and multi-language projects
+    lowered = file_path.lower()
+    # The automaton reports every pattern occurrence in one pass; the smallest
+    # index wins (the leftmost match is not necessarily the highest priority)
+    if _PRIORITY_AUTOMATON is not None:
+        return min((i for _, i in _PRIORITY_AUTOMATON.iter(lowered)), default=len(_PRIORITY_PATTERNS_LOWER))
     
-    Attributes:
-        github_token (str): GitHub API token for authentication
-        model (str): AI model identifier (e.g., 'claude-sonnet', 'gpt-4')
-        config (Dict[str, Any]): Configuration dictionary
-        api_key (str): API key for the selected AI model
-        base_url (str): Base URL for AI API calls
-        client (OpenAI): OpenAI-compatible client for AI API calls
-        
+    # One regex scan rejects the common no-match case; only matching paths
+    # pay for the in-order search that picks the highest-priority pattern
+    if not _PRIORITY_RE.search(lowered):
+        return len(_PRIORITY_PATTERNS_LOWER)
+    return next(i for i, pattern in enumerate(_PRIORITY_PATTERNS_LOWER) if pattern in lowered)
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document, using orjson when it is installed.
+
+    Args:
+        data (Union[str, bytes]): JSON text or raw UTF-8 bytes (e.g. ``response.content``)
+
+    Returns:
+        Any: Parsed value
+
     Raises:
-        ConfigurationError: When required configuration is missing or invalid
-        GitHubAPIError: When GitHub API calls fail
-        AIModelError: When AI model calls fail
+        json.JSONDecodeError: If the document is invalid (orjson's error subclasses it)
     """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
-    def __init__(self, model: str = Constants.DEFAULT_MODEL, config_file: Optional[str] = None):
-        """
-        Initialize the analyzer with model and optional configuration file.
 
-        Args:
-            model (str): AI model to use (e.g., 'claude-sonnet', 'gpt-4', 'gemini')
-            config_file (str, optional): Path to configuration file (TOML, YAML, or JSON)
-            
-        Raises:
-            ConfigurationError: If API client initialization fails or required keys are missing
-            
-        Example:
-            >>> analyzer = UniversalRepoAnalyzer('claude-sonnet', 'config.toml')
-            >>> context = analyzer.get_full_repository_context('https://github.com/owner/repo')
-        """
-        logger.info(f"Initializing {Constants.APP_NAME} v{Constants.APP_VERSION}")
-        logger.info(f"Log file: {log_file_path}")
-        
-        # Validate and normalize model name
-        self.model = self._normalize_model_name(model)
-        logger.info(f"Using AI model: {self.model}")
-        
-        # Load configuration
-        self.config = self._load_config(config_file)
-        
-        # Setup GitHub authentication
-        self.github_token = os.getenv(Constants.GITHUB_TOKEN_ENV)
-        if not self.github_token:
-            logger.warning(
-                f"{Constants.GITHUB_TOKEN_ENV} not set. "
-                "GitHub API rate limits will apply (60 requests/hour vs 5000/hour authenticated)"
-            )
-        
-        # Setup AI client
-        try:
-            self.api_key = self._get_api_key_for_model()
-            self.base_url = self._get_base_url_for_model()
-            
-            self.client = openai.OpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url
-            )
-            logger.info(f"Initialized AI client for {self.model} with base_url: {self.base_url}")
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize AI client: {e}")
-            raise ConfigurationError(f"Cannot initialize AI client for {self.model}: {e}")
+def _json_dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize a value to JSON text, using orjson when it is installed.
 
-    def _normalize_model_name(self, model: str) -> str:
-        """
-        Normalize and validate the model name.
-        
-        Args:
-            model (str): Raw model name from user input
-            
-        Returns:
-            str: Normalized model name
-            
-        Raises:
-            ConfigurationError: If model name is not supported
-        """
-        normalized = model.lower().strip()
-        
-        # Check if it's a valid model
-        if normalized not in Constants.MODEL_NAME_MAP:
-            available_models = list(Constants.MODEL_NAME_MAP.keys())
-            logger.error(f"Unsupported model '{model}'. Available models: {available_models}")
-            raise ConfigurationError(f"Unsupported model '{model}'. Available: {available_models}")
-        
-        return normalized
+    Args:
+        obj (Any): Value to serialize
+        indent (bool): Pretty-print with two-space indentation
 
-    def _get_api_key_for_model(self) -> str:
-        """
-        Get the universal AI API key from environment variable.
+    Returns:
+        str: JSON text (non-ASCII characters are kept as-is)
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
 
-        Returns:
-            str: AI API key for all providers
 
-        Raises:
-            ConfigurationError: If the AI API key is not set
+def _json_dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize a value to UTF-8 JSON bytes, ready to be written to a binary file.
 
-        Note:
-            Uses a single AI_API_KEY environment variable for all AI providers.
-            This simplifies configuration while supporting all models.
-        """
-        api_key = os.getenv(Constants.AI_API_KEY_ENV)
+    Args:
+        obj (Any): Value to serialize
+        indent (bool): Pretty-print with two-space indentation
 
-        if not api_key:
-            logger.error(f"Required environment variable {Constants.AI_API_KEY_ENV} not set")
-            raise ConfigurationError(
-                f"{Constants.AI_API_KEY_ENV} not set in environment. "
-                f"Please set this environment variable with your API key. "
-                f"This single key will be used for all AI models ({self.model})."
-            )
+    Returns:
+        bytes: UTF-8 encoded JSON (orjson emits bytes directly, skipping a str round trip)
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
 
-        # Validate API key format (basic check)
-        if len(api_key.strip()) < 10:
-            logger.warning(f"API key seems too short. Please verify your {Constants.AI_API_KEY_ENV}.")
 
-        return api_key
+@functools.lru_cache(maxsize=None)
+def _ensure_directory(path: Path) -> None:
+    """
+    Create a directory and its parents unless this process already did.
 
-    def _get_base_url_for_model(self) -> str:
-        """
-        Get the base URL for API calls, checking config, environment, then defaults.
+    Args:
+        path (Path): Directory to create
+    """
+    path.mkdir(parents=True, exist_ok=True)
 
-        Returns:
-            str: Base URL for the selected model
 
-        Note:
-            Priority order:
-            1. Configuration file setting for 'base_url'
-            2. Environment variable AI_API_BASE_URL
-            3. Default hardcoded URL (same for all models)
-        """
-        # Check configuration file first
-        config_urls = self.config.get('api_base_urls', {})
-        if 'base_url' in config_urls:
-            logger.info(f"Using base URL from config: {config_urls['base_url']}")
-            return config_urls['base_url']
+@functools.lru_cache(maxsize=8)
+def _split_prompt_template(template: str) -> Tuple[str, ...]:
+    """
+    Split a custom prompt template into literal text and placeholder names.
 
-        # Check environment variable
-        env_url = os.getenv('AI_API_BASE_URL')
-        if env_url:
-            logger.info(f"Using base URL from environment AI_API_BASE_URL: {env_url}")
-            return env_url
+    Args:
+        template (str): Template using {NAME} placeholders (see _PLACEHOLDER_RE)
 
-        # Use default (same for all models)
-        default_url = Constants.BASE_URL
-        logger.info(f"Using default base URL: {default_url}")
-        return default_url
+    Returns:
+        Tuple[str, ...]: Alternating literal text and placeholder names; names
+        sit at the odd indices, and unknown {...} text stays literal
+    """
+    return tuple(_PLACEHOLDER_RE.split(template))
 
-    def _load_config(self, config_file: Optional[str]) -> Dict[str, Any]:
-        """
-        Load configuration from file or use defaults. Supports TOML, YAML, and JSON.
 
-        Args:
-            config_file (str, optional): Path to configuration file
-            
-        Returns:
-            Dict[str, Any]: Configuration dictionary with defaults applied
-            
-        Note:
-            Configuration file format is auto-detected based on file extension:
-            - .toml -> TOML format
-            - .yml/.yaml -> YAML format  
-            - .json -> JSON format
-            
-            If loading fails, defaults are used and a warning is logged.
-        """
-        config = Constants.DEFAULT_CONFIG.copy()
+@functools.lru_cache(maxsize=32)
+def _normalize_model_key(model: str) -> Optional[str]:
+    """
+    Map a user-supplied model name to its MODEL_NAME_MAP key.
 
-        if not config_file:
-            logger.info("No configuration file specified, using defaults")
-            return config
+    Args:
+        model (str): Raw model name from user input
 
-        config_path = Path(config_file)
-        if not config_path.exists():
-            logger.warning(f"Configuration file {config_file} not found, using defaults")
-            return config
+    Returns:
+        Optional[str]: Normalized model name, or None if it is not supported
+    """
+    normalized = model.lower().strip()
+    return normalized if normalized in Constants.MODEL_NAME_MAP else None
 
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                file_extension = config_path.suffix.lower()
-                
-                if file_extension == '.toml':
-                    user_config = toml.load(f)
-                elif file_extension in ['.yml', '.yaml']:
-                    user_config = yaml.safe_load(f)
-                elif file_extension == '.json':
-                    user_config = json.load(f)
-                else:
-                    # Try to auto-detect format by content
-                    content = f.read()
-                    f.seek(0)
-                    
-                    if content.strip().startswith('{'):
-                        user_config = json.load(f)
-                    elif '=' in content and '[' in content:
-                        f.seek(0)
-                        user_config = toml.load(f)
-                    else:
-                        f.seek(0)
-                        user_config = yaml.safe_load(f)
-                
-                # Merge user config with defaults
-                config.update(user_config)
-                logger.info(f"Successfully loaded configuration from {config_file}")
-                
-                # Validate critical config values
-                self._validate_config(config)
-                
-        except Exception as e:
-            logger.error(f"Failed to load configuration file {config_file}: {e}")
-            logger.info("Continuing with default configuration")
 
-        return config
+@functools.lru_cache(maxsize=32)
+def _resolve_base_url(config_base_url: Optional[str], env_base_url: Optional[str]) -> Tuple[str, str]:
+    """
+    Pick the AI API base URL from the configured sources.
 
-    def _validate_config(self, config: Dict[str, Any]) -> None:
-        """
-        Validate configuration values and apply reasonable limits.
-        
-        Args:
-            config (Dict[str, Any]): Configuration dictionary to validate
-            
-        Note:
-            Modifies config in-place to ensure values are within reasonable bounds.
-        """
-        # Ensure numeric values are within reasonable bounds
-        if config.get('max_files_to_analyze', 0) > 200:
-            logger.warning("max_files_to_analyze too high, capping at 200")
-            config['max_files_to_analyze'] = 200
-        
-        if config.get('max_file_size', 0) > 50000:
-            logger.warning("max_file_size too high, capping at 50000 characters")
-            config['max_file_size'] = 50000
-        
-        # Ensure required lists exist
-        if not isinstance(config.get('command_categories'), list):
-            config['command_categories'] = Constants.DEFAULT_CONFIG['command_categories']
-        
-        if not isinstance(config.get('excluded_directories'), list):
-            config['excluded_directories'] = Constants.DEFAULT_CONFIG['excluded_directories']
+    Args:
+        config_base_url (str, optional): 'base_url' from the api_base_urls config table
+        env_base_url (str, optional): Value of the AI_API_BASE_URL environment variable
 
-    def _parse_github_url(self, repo_url: str) -> Tuple[str, str]:
-        """
-        Parse GitHub repository URL to extract owner and repository name.
-        
-        Args:
-            repo_url (str): GitHub repository URL
-            
-        Returns:
-            Tuple[str, str]: (owner, repository_name)
-            
-        Raises:
-            ValueError: If URL format is invalid
-            
-        Example:
-            >>> owner, repo = self._parse_github_url('https://github.com/owner/repo.git')
-            >>> print(f"{owner}/{repo}")  # outputs: owner/repo
-        """
-        try:
-            # Handle various GitHub URL formats
-            url = repo_url.strip()
-            
-            # Remove common prefixes and suffixes
-            url = url.replace('https://github.com/', '')
-            url = url.replace('http://github.com/', '')
-            url = url.replace('git@github.com:', '')
-            url = url.replace('.git', '')
-            url = url.rstrip('/')
-            
-            # Split and validate
-            parts = url.split('/')
-            if len(parts) != 2:
-                raise ValueError(f"Expected format: owner/repo, got: {url}")
-            
-            owner, repo = parts[0], parts[1]
-            
-            # Basic validation
-            if not owner or not repo:
-                raise ValueError("Owner and repository name cannot be empty")
-            
-            # GitHub username/repo name validation (basic)
-            if not re.match(r'^[a-zA-Z0-9._-]+$', owner):
-                raise ValueError(f"Invalid owner name: {owner}")
-            if not re.match(r'^[a-zA-Z0-9._-]+$', repo):
-                raise ValueError(f"Invalid repository name: {repo}")
-            
-            logger.debug(f"Parsed GitHub URL: {owner}/{repo}")
-            return owner, repo
-            
-        except Exception as e:
-            logger.error(f"Failed to parse GitHub URL '{repo_url}': {e}")
-            raise ValueError(f"Invalid GitHub URL format: {repo_url}. Expected: https://github.com/owner/repo")
-
-    def get_full_repository_context(self, repo_url: str) -> Dict[str, Any]:
-        """
-        Fetch comprehensive repository context using AI-driven discovery.
-
-        This method orchestrates the complete repository analysis process:
-        1. Fetches repository metadata from GitHub API
-        2. Retrieves complete file tree structure
-        3. Uses AI to select important files for analysis
-        4. Downloads content of selected files
-        5. Performs AI-driven structure analysis
-
-        Args:
-            repo_url (str): GitHub repository URL
-            
-        Returns:
-            Dict[str, Any]: Repository context dictionary containing:
-                - owner (str): Repository owner
-                - repo (str): Repository name  
-                - metadata (Dict): Repository metadata from GitHub API
-                - all_files (List[str]): Complete list of file paths
-                - structure (Dict): AI-generated structure analysis
-                - file_contents (Dict[str, str]): Content of analyzed files
-                - total_files (int): Total number of files in repository
-                - analyzed_files (int): Number of files actually analyzed
-                - error (str): Error message if analysis failed
-                
-        Note:
-            If any step fails, returns a dictionary with an 'error' key
-            containing the error message.
-        """
-        try:
-            # Parse and validate GitHub URL
-            owner, repo = self._parse_github_url(repo_url)
-            logger.info(f"Starting analysis for {owner}/{repo}")
-            
-            # Setup request headers for GitHub API
-            headers = self._get_github_headers()
-            
-            # Step 1: Fetch repository metadata
-            logger.info("Fetching repository metadata...")
-            repo_info = self._fetch_repo_info(owner, repo, headers)
-            if not repo_info:
-                raise GitHubAPIError("Failed to fetch repository metadata")
-            
-            # Step 2: Fetch complete file tree
-            logger.info("Fetching complete file tree...")
-            all_files = self._fetch_complete_file_tree(owner, repo, headers)
-            if not all_files:
-                raise GitHubAPIError("Failed to fetch repository file tree")
-            
-            # Filter out excluded files and directories
-            filtered_files = self._filter_files(all_files)
-            logger.info(f"Filtered {len(all_files)} files to {len(filtered_files)} relevant files")
-            
-            # Step 3: AI-driven file selection for detailed analysis
-            logger.info("Using AI to select important files for analysis...")
-            important_files = self._ai_select_files_to_analyze(filtered_files, repo_info)
-            
-            # Step 4: Fetch content of selected files
-            logger.info(f"Fetching content for {len(important_files)} selected files...")
-            file_contents = self._fetch_file_contents(owner, repo, important_files, headers)
-            
-            # Step 5: AI-driven structure analysis
-            logger.info("Performing AI-driven structure analysis...")
-            structure_analysis = self._ai_analyze_repo_structure(filtered_files, repo_info)
-
-            # Compile comprehensive context
-            context = {
-                'owner': owner,
-                'repo': repo,
-                'metadata': repo_info,
-                'all_files': filtered_files,
-                'structure': structure_analysis,
-                'file_contents': file_contents,
-                'total_files': len(filtered_files),
-                'analyzed_files': len(file_contents),
-                'analysis_timestamp': datetime.now().isoformat(),
-                'analyzer_version': Constants.APP_VERSION
-            }
-            
-            logger.info(
-                f"Repository context successfully compiled: "
-                f"{context['total_files']} total files, "
-                f"{context['analyzed_files']} analyzed in detail"
-            )
-            
-            return context
-
-        except Exception as e:
-            error_msg = f"Error fetching repository context: {e}"
-            logger.error(error_msg)
-            return {
-                'error': error_msg,
-                'error_type': type(e).__name__,
-                'repo_url': repo_url,
-                'timestamp': datetime.now().isoformat()
-            }
-
-    def _get_github_headers(self) -> Dict[str, str]:
-        """
-        Get headers for GitHub API requests including authentication if available.
-        
-        Returns:
-            Dict[str, str]: HTTP headers for GitHub API requests
-        """
-        headers = {
-            'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': f'{Constants.APP_NAME}/{Constants.APP_VERSION}'
-        }
-        
-        if self.github_token:
-            headers['Authorization'] = f'token {self.github_token}'
-            
-        return headers
-
-    def _filter_files(self, all_files: List[str]) -> List[str]:
-        """
-        Filter files to exclude irrelevant directories and file types.
-        
-        Args:
-            all_files (List[str]): Complete list of file paths
-            
-        Returns:
-            List[str]: Filtered list of relevant file paths
-        """
-        filtered = []
-        excluded_dirs = self.config.get('excluded_directories', [])
-        excluded_extensions = self.config.get('excluded_file_extensions', [])
-        
-        for file_path in all_files:
-            # Skip files in excluded directories
-            if any(excluded_dir in file_path.split('/') for excluded_dir in excluded_dirs):
-                continue
-            
-            # Skip files with excluded extensions
-            if any(file_path.endswith(ext) for ext in excluded_extensions):
-                continue
-            
-            # Only include files with supported extensions or no extension
-            file_ext = Path(file_path).suffix.lower()
-            if file_ext and file_ext not in Constants.SUPPORTED_EXTENSIONS:
-                continue
-                
-            filtered.append(file_path)
-        
-        return filtered
-
-    def _fetch_repo_info(self, owner: str, repo: str, headers: Dict[str, str]) -> Dict[str, Any]:
-        """
-        Fetch repository metadata from GitHub API with error handling and rate limiting.
-
-        Args:
-            owner (str): Repository owner username
-            repo (str): Repository name
-            headers (Dict[str, str]): HTTP headers for authentication
-            
-        Returns:
-            Dict[str, Any]: Repository metadata or empty dict on failure
-            
-        Raises:
-            GitHubAPIError: If API request fails after retries
-        """
-        url = f"{Constants.GITHUB_API_BASE}/{owner}/{repo}"
-        
-        for attempt in range(3):  # Retry up to 3 times
-            try:
-                logger.debug(f"Fetching repository info (attempt {attempt + 1}): {url}")
-                
-                response = requests.get(
-                    url, 
-                    headers=headers, 
-                    timeout=Constants.GITHUB_API_TIMEOUT
-                )
-                
-                # Handle rate limiting
-                if response.status_code == 403 and 'rate limit' in response.text.lower():
-                    reset_time = response.headers.get('X-RateLimit-Reset')
-                    if reset_time:
-                        reset_datetime = datetime.fromtimestamp(int(reset_time))
-                        logger.warning(f"GitHub rate limit exceeded. Resets at {reset_datetime}")
-                    raise GitHubAPIError("GitHub API rate limit exceeded")
-                
-                response.raise_for_status()
-                repo_data = response.json()
-                
-                # Log rate limit status
-                remaining = response.headers.get('X-RateLimit-Remaining')
-                if remaining:
-                    logger.debug(f"GitHub API requests remaining: {remaining}")
-                
-                return repo_data
-                
-            except requests.exceptions.Timeout:
-                logger.warning(f"GitHub API timeout (attempt {attempt + 1})")
-                if attempt < 2:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                continue
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"GitHub API request failed (attempt {attempt + 1}): {e}")
-                if attempt < 2:
-                    time.sleep(2 ** attempt)
-                    continue
-                raise GitHubAPIError(f"Failed to fetch repository info: {e}")
-        
-        return {}
-
-    def _fetch_complete_file_tree(self, owner: str, repo: str, headers: Dict[str, str]) -> List[str]:
-        """
-        Fetch complete file tree recursively from GitHub API with error handling.
-
-        Args:
-            owner (str): Repository owner username
-            repo (str): Repository name  
-            headers (Dict[str, str]): HTTP headers for authentication
-            
-        Returns:
-            List[str]: List of file paths or empty list on failure
-            
-        Note:
-            Uses GitHub's recursive tree API which is more efficient than
-            making multiple API calls for directory traversal.
-        """
-        url = f"{Constants.GITHUB_API_BASE}/{owner}/{repo}{Constants.GITHUB_TREE_ENDPOINT}"
-        
-        for attempt in range(3):
-            try:
-                logger.debug(f"Fetching file tree (attempt {attempt + 1}): {url}")
-                
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    timeout=Constants.GITHUB_API_TIMEOUT
-                )
-                
-                # Handle rate limiting
-                if response.status_code == 403 and 'rate limit' in response.text.lower():
-                    raise GitHubAPIError("GitHub API rate limit exceeded")
-                
-                response.raise_for_status()
-                tree_data = response.json()
-                
-                # Extract file paths (blobs only, not trees/directories)
-                file_paths = [
-                    item['path'] 
-                    for item in tree_data.get('tree', []) 
-                    if item['type'] == 'blob'
-                ]
-                
-                logger.info(f"Retrieved {len(file_paths)} files from repository tree")
-                return file_paths
-                
-            except requests.exceptions.Timeout:
-                logger.warning(f"File tree fetch timeout (attempt {attempt + 1})")
-                if attempt < 2:
-                    time.sleep(2 ** attempt)
-                continue
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Failed to fetch file tree (attempt {attempt + 1}): {e}")
-                if attempt < 2:
-                    time.sleep(2 ** attempt)
-                    continue
-                raise GitHubAPIError(f"Failed to fetch file tree: {e}")
-        
-        return []
-
-    def _ai_select_files_to_analyze(self, all_files: List[str], repo_info: Dict[str, Any]) -> List[str]:
-        """
-        Use AI to intelligently select the most important files for detailed analysis.
-        
-        Falls back to heuristic selection if AI call fails.
-
-        Args:
-            all_files (List[str]): Complete list of file paths in repository
-            repo_info (Dict[str, Any]): Repository metadata from GitHub API
-            
-        Returns:
-            List[str]: List of selected file paths for detailed analysis
-            
-        Note:
-            AI selection considers:
-            - Build and configuration files
-            - CI/CD workflows  
-            - Key source files indicating architecture
-            - Monorepo detection and handling
-            - Multi-language project support
-        """
-        # Limit files shown to AI to prevent prompt overflow
-        files_sample = all_files[:Constants.MAX_FILES_IN_PROMPT]
-        files_list = "\n".join(f"- {f}" for f in files_sample)
-        
-        # Prepare additional context
-        topics = repo_info.get('topics', [])
-        topics_str = ", ".join(topics) if topics else "None specified"
-        
-        selection_prompt = f"""
+    Returns:
+        Tuple[str, str]: The base URL and a description of where it came from
+    """
+    if config_base_url:
+        return config_base_url, 'config'
+    if env_base_url:
+        return env_base_url, 'environment AI_API_BASE_URL'
+    return Constants.BASE_URL, 'defaults'
+
+# Prompt templates for the AI calls. Each is split into a fixed system prompt
+# (role, rules and output schema) and a per-repository user template filled
+# with str.format_map, so the invariant prefix is byte-identical across runs
+# and can be served from the provider's prompt cache. Literal braces in the
+# JSON schemas are doubled only where the text goes through format_map.
+_SELECTION_SYSTEM_PROMPT = """
 You are an expert software engineer analyzing a repository to identify the most crucial files for understanding its build system, architecture, and development workflow.
 
-REPOSITORY CONTEXT:
-Name: {repo_info.get('name', 'Unknown')}
-Description: {repo_info.get('description', 'No description provided')}
-Primary Language: {repo_info.get('language', 'Not specified')}
-Topics/Tags: {topics_str}
-Size: {repo_info.get('size', 0)} KB
-Stars: {repo_info.get('stargazers_count', 0)}
-Forks: {repo_info.get('forks_count', 0)}
-Total Files Available: {len(all_files)}
-
-FILES TO ANALYZE (showing first {len(files_sample)} of {len(all_files)}):
-{files_list}
-
 SELECTION CRITERIA:
-Select exactly {self.config['max_files_to_analyze']} files that are most important for:
+Select the requested number of files that are most important for:
 1. Understanding build processes and dependencies
 2. Identifying project structure and architecture
 3. Recognizing CI/CD workflows and deployment
@@ -884,224 +512,29 @@ OUTPUT FORMAT:
 Return ONLY a valid JSON array of file paths, no additional text:
 ["path/to/file1", "path/to/file2", "path/to/file3", ...]
 
-Ensure all selected files exist in the provided list above.
+Ensure all selected files exist in the provided file list.
 """
 
-        try:
-            logger.debug("Requesting AI file selection...")
-            ai_response = self._call_ai_model(selection_prompt)
-            
-            if isinstance(ai_response, str):
-                # Extract JSON array from response
-                start_idx = ai_response.find('[')
-                end_idx = ai_response.rfind(']') + 1
-                
-                if start_idx != -1 and end_idx > 0:
-                    json_str = ai_response[start_idx:end_idx]
-                    selected_files = json.loads(json_str)
-                    
-                    # Validate that selected files exist in our file list
-                    valid_selected = [
-                        f for f in selected_files 
-                        if isinstance(f, str) and f in all_files
-                    ]
-                    
-                    if valid_selected:
-                        logger.info(f"AI selected {len(valid_selected)} files for analysis")
-                        return valid_selected[:self.config['max_files_to_analyze']]
-                    else:
-                        logger.warning("AI selected no valid files, falling back to heuristic")
-                        
-        except json.JSONDecodeError as e:
-            logger.warning(f"AI file selection returned invalid JSON: {e}")
-        except Exception as e:
-            logger.warning(f"AI file selection failed: {e}")
-
-        # Fallback: Heuristic selection using priority patterns
-        logger.info("Using heuristic file selection as fallback")
-        return self._heuristic_file_selection(all_files)
-
-    def _heuristic_file_selection(self, all_files: List[str]) -> List[str]:
-        """
-        Fallback heuristic method for selecting important files when AI selection fails.
-        
-        Args:
-            all_files (List[str]): Complete list of file paths
-            
-        Returns:
-            List[str]: Heuristically selected file paths
-            
-        Note:
-            Uses priority patterns and scoring to select the most likely
-            important files for repository analysis.
-        """
-        scored_files = []
-        
-        for file_path in all_files:
-            score = 0
-            file_name = os.path.basename(file_path).lower()
-            
-            # Score based on priority patterns
-            for i, pattern in enumerate(Constants.PRIORITY_PATTERNS):
-                if pattern.lower() in file_path.lower():
-                    # Higher score for higher priority patterns
-                    score += (len(Constants.PRIORITY_PATTERNS) - i) * 10
-                    break
-            
-            # Additional scoring factors
-            if file_path.count('/') == 0:  # Root level files
-                score += 5
-            if 'config' in file_name or 'setup' in file_name:
-                score += 3
-            if file_name in ['readme.md', 'license', 'contributing.md']:
-                score += 2
-            
-            if score > 0:
-                scored_files.append((file_path, score))
-        
-        # Sort by score and take top files
-        scored_files.sort(key=lambda x: x[1], reverse=True)
-        selected = [f[0] for f in scored_files[:self.config['max_files_to_analyze']]]
-        
-        logger.info(f"Heuristic selection chose {len(selected)} files")
-        return selected
-
-    def _fetch_file_contents(self, owner: str, repo: str, file_paths: List[str], headers: Dict[str, str]) -> Dict[str, str]:
-        """
-        Fetch contents of selected files with size limits, encoding handling, and error recovery.
-
-        Args:
-            owner (str): Repository owner username
-            repo (str): Repository name
-            file_paths (List[str]): List of file paths to fetch content for
-            headers (Dict[str, str]): HTTP headers for authentication
-            
-        Returns:
-            Dict[str, str]: Dictionary mapping file paths to their text contents
-            
-        Note:
-            - Handles binary files by skipping them
-            - Applies size limits to prevent memory issues
-            - Uses proper error handling to continue on individual file failures
-            - Implements rate limiting awareness
-        """
-        file_contents = {}
-        total_content_size = 0
-        max_total_size = Constants.MAX_TOTAL_CONTENT_SIZE
-        
-        for i, file_path in enumerate(file_paths):
-            # Check if we've exceeded total content size limit
-            if total_content_size >= max_total_size:
-                logger.warning(f"Reached maximum total content size ({max_total_size} chars), stopping at {i+1}/{len(file_paths)} files")
-                break
-                
-            try:
-                url = f"{Constants.GITHUB_API_BASE}/{owner}/{repo}{Constants.GITHUB_CONTENTS_ENDPOINT}/{file_path}"
-                logger.debug(f"Fetching content for: {file_path}")
-                
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    timeout=Constants.GITHUB_API_TIMEOUT
-                )
-                
-                # Handle rate limiting gracefully
-                if response.status_code == 403 and 'rate limit' in response.text.lower():
-                    logger.warning("Hit rate limit while fetching file contents")
-                    break
-                
-                # Skip files that don't exist or are inaccessible
-                if response.status_code == 404:
-                    logger.debug(f"File not found (may be in submodule): {file_path}")
-                    continue
-                    
-                response.raise_for_status()
-                content_data = response.json()
-                
-                # Handle base64 encoded content
-                if content_data.get('encoding') == 'base64':
-                    try:
-                        decoded_bytes = base64.b64decode(content_data['content'])
-                        
-                        # Try to decode as UTF-8, skip binary files
-                        try:
-                            decoded_text = decoded_bytes.decode('utf-8')
-                        except UnicodeDecodeError:
-                            logger.debug(f"Skipping binary file: {file_path}")
-                            continue
-                        
-                        # Apply size limit per file
-                        max_size = self.config['max_file_size']
-                        if len(decoded_text) > max_size:
-                            logger.debug(f"Truncating large file {file_path} from {len(decoded_text)} to {max_size} chars")
-                            decoded_text = decoded_text[:max_size] + "\n... (truncated)"
-                        
-                        file_contents[file_path] = decoded_text
-                        total_content_size += len(decoded_text)
-                        
-                    except Exception as decode_error:
-                        logger.warning(f"Failed to decode content for {file_path}: {decode_error}")
-                        continue
-                        
-                else:
-                    logger.warning(f"Unexpected encoding for {file_path}: {content_data.get('encoding')}")
-                    
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Failed to fetch content for {file_path}: {e}")
-                continue
-            except Exception as e:
-                logger.warning(f"Unexpected error fetching {file_path}: {e}")
-                continue
-        
-        logger.info(f"Successfully fetched content for {len(file_contents)}/{len(file_paths)} files ({total_content_size} total chars)")
-        return file_contents
+_SELECTION_PROMPT_TEMPLATE = """
+REPOSITORY CONTEXT:
+Name: {name}
+Description: {description}
+Primary Language: {language}
+Topics/Tags: {topics}
+Size: {size} KB
+Stars: {stars}
+Forks: {forks}
+Total Files Available: {total_files}
+
+FILES TO ANALYZE (showing {shown_files} candidates of {total_files}):
+{files_list}
 
-    def _ai_analyze_repo_structure(self, all_files: List[str], repo_info: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Use AI to analyze repository structure, detecting patterns like monorepos, 
-        multi-language setups, and architectural decisions.
-        
-        Falls back to basic analysis if AI fails.
+Select exactly {max_files} files.
+"""
 
-        Args:
-            all_files (List[str]): Complete list of file paths in repository
-            repo_info (Dict[str, Any]): Repository metadata from GitHub API
-            
-        Returns:
-            Dict[str, Any]: Comprehensive structure analysis dictionary
-            
-        Note:
-            Analysis includes:
-            - Directory structure and organization
-            - Language detection and distribution  
-            - Monorepo vs single-project identification
-            - Testing, documentation, and CI/CD presence
-            - Architectural patterns and frameworks
-        """
-        # Prepare file list for analysis (limit to prevent prompt overflow)
-        files_sample = all_files[:Constants.MAX_FILES_IN_PROMPT]
-        files_list = "\n".join(f"- {f}" for f in files_sample)
-        
-        # Prepare additional context
-        topics = repo_info.get('topics', [])
-        topics_str = ", ".join(topics) if topics else "None"
-        
-        structure_prompt = f"""
+_STRUCTURE_SYSTEM_PROMPT = """
 You are an expert software architect analyzing a repository's structure and organization patterns.
 
-REPOSITORY CONTEXT:
-Name: {repo_info.get('name', 'Unknown')}
-Description: {repo_info.get('description', 'No description provided')}
-Primary Language: {repo_info.get('language', 'Not specified')}
-Topics/Tags: {topics_str}
-Size: {repo_info.get('size', 0)} KB
-Created: {repo_info.get('created_at', 'Unknown')}
-Last Updated: {repo_info.get('updated_at', 'Unknown')}
-Default Branch: {repo_info.get('default_branch', 'main')}
-
-FILES STRUCTURE (showing {len(files_sample)} of {len(all_files)} total files):
-{files_list}
-
 ANALYSIS REQUIREMENTS:
 Analyze the repository structure comprehensively, focusing on:
 
@@ -1124,27 +557,27 @@ SPECIFIC DETECTIONS:
 OUTPUT FORMAT:
 Return ONLY a valid JSON object with this exact structure:
 
-{{
-    "directories": {{
+{
+    "directories": {
         "main_directories": ["list of primary directories"],
         "source_directories": ["directories containing source code"],
         "config_directories": ["directories with configuration"],
         "test_directories": ["directories with tests"],
         "doc_directories": ["directories with documentation"]
-    }},
-    "languages": {{
+    },
+    "languages": {
         "primary_language": "main language detected",
         "secondary_languages": ["other languages found"],
-        "language_distribution": {{"language": "estimated_percentage"}},
+        "language_distribution": {"language": "estimated_percentage"},
         "frameworks_detected": ["frameworks and libraries identified"]
-    }},
-    "project_type": {{
+    },
+    "project_type": {
         "architecture": "monorepo|single-project|microservices|library|application",
         "complexity": "simple|moderate|complex|enterprise",
         "domain": "web|mobile|desktop|cli|library|api|fullstack|data|ml",
         "scale": "personal|team|enterprise|open-source"
-    }},
-    "features": {{
+    },
+    "features": {
         "has_tests": boolean,
         "has_ci_cd": boolean,
         "has_documentation": boolean,
@@ -1153,402 +586,59 @@ Return ONLY a valid JSON object with this exact structure:
         "has_api": boolean,
         "has_frontend": boolean,
         "has_backend": boolean
-    }},
-    "monorepo_analysis": {{
+    },
+    "monorepo_analysis": {
         "is_monorepo": boolean,
         "workspace_tool": "lerna|nx|rush|yarn-workspaces|npm-workspaces|none",
         "packages": ["list of package/workspace directories if monorepo"],
         "shared_dependencies": boolean
-    }},
-    "build_system": {{
+    },
+    "build_system": {
         "build_tools": ["detected build tools"],
         "package_managers": ["npm|yarn|pip|maven|gradle|cargo|go-mod|etc"],
         "bundlers": ["webpack|rollup|vite|parcel|etc"],
         "task_runners": ["npm-scripts|gulp|grunt|make|etc"]
-    }},
-    "deployment": {{
+    },
+    "deployment": {
         "deployment_targets": ["cloud platforms or deployment types detected"],
         "containerization": "docker|kubernetes|none",
         "infrastructure_as_code": "terraform|ansible|helm|none"
-    }},
-    "quality_assurance": {{
+    },
+    "quality_assurance": {
         "linting": ["eslint|pylint|golint|etc if detected"],
         "formatting": ["prettier|black|gofmt|etc if detected"],
         "testing_frameworks": ["jest|pytest|junit|etc if detected"],
         "code_coverage": boolean
-    }},
-    "insights": {{
+    },
+    "insights": {
         "architectural_patterns": ["patterns identified"],
         "notable_conventions": ["naming, structure, organization patterns"],
         "potential_improvements": ["suggestions based on structure analysis"],
         "estimated_team_size": "individual|small-team|large-team|enterprise",
         "maintenance_level": "active|maintained|legacy|experimental"
-    }}
-}}
+    }
+}
 
 Ensure the response is valid JSON only, with no additional text or markdown formatting.
 """
 
-        try:
-            logger.debug("Requesting AI structure analysis...")
-            ai_response = self._call_ai_model(structure_prompt)
-            
-            if isinstance(ai_response, str):
-                # Extract JSON from response
-                start_idx = ai_response.find('{')
-                end_idx = ai_response.rfind('}') + 1
-                
-                if start_idx != -1 and end_idx > 0:
-                    json_str = ai_response[start_idx:end_idx]
-                    structure_analysis = json.loads(json_str)
-                    
-                    logger.info("AI structure analysis completed successfully")
-                    return structure_analysis
-                    
-        except json.JSONDecodeError as e:
-            logger.warning(f"AI structure analysis returned invalid JSON: {e}")
-        except Exception as e:
-            logger.warning(f"AI structure analysis failed: {e}")
+_STRUCTURE_PROMPT_TEMPLATE = """
+REPOSITORY CONTEXT:
+Name: {name}
+Description: {description}
+Primary Language: {language}
+Topics/Tags: {topics}
+Size: {size} KB
+Created: {created_at}
+Last Updated: {updated_at}
+Default Branch: {default_branch}
+
+FILES STRUCTURE (showing {shown_files} of {total_files} total files):
+{files_list}
+"""
 
-        # Fallback: Basic heuristic structure analysis
-        logger.info("Using fallback heuristic structure analysis")
-        return self._heuristic_structure_analysis(all_files, repo_info)
-
-    def _heuristic_structure_analysis(self, all_files: List[str], repo_info: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Fallback heuristic method for analyzing repository structure when AI fails.
-        
-        Args:
-            all_files (List[str]): Complete list of file paths
-            repo_info (Dict[str, Any]): Repository metadata
-            
-        Returns:
-            Dict[str, Any]: Basic structure analysis
-        """
-        # Extract directory structure
-        directories = set()
-        file_extensions = {}
-        
-        for file_path in all_files:
-            # Count directories
-            dir_parts = file_path.split('/')[:-1]
-            for i in range(len(dir_parts)):
-                directories.add('/'.join(dir_parts[:i+1]))
-            
-            # Count file extensions
-            if '.' in file_path:
-                ext = os.path.splitext(file_path)[1].lower()
-                file_extensions[ext] = file_extensions.get(ext, 0) + 1
-        
-        # Basic language detection
-        extension_to_language = {
-            '.js': 'JavaScript', '.ts': 'TypeScript', '.py': 'Python',
-            '.java': 'Java', '.go': 'Go', '.rs': 'Rust', '.cpp': 'C++',
-            '.c': 'C', '.cs': 'C#', '.rb': 'Ruby', '.php': 'PHP',
-            '.swift': 'Swift', '.kt': 'Kotlin', '.scala': 'Scala'
-        }
-        
-        languages_detected = []
-        for ext, count in file_extensions.items():
-            if ext in extension_to_language and count > 0:
-                languages_detected.append(extension_to_language[ext])
-        
-        # Basic feature detection
-        has_tests = any('test' in f.lower() or 'spec' in f.lower() for f in all_files)
-        has_ci_cd = any('.github/' in f or '.gitlab-ci' in f or 'jenkinsfile' in f.lower() for f in all_files)
-        has_docker = any('dockerfile' in f.lower() or 'docker-compose' in f.lower() for f in all_files)
-        has_docs = any('readme' in f.lower() or 'doc' in f.lower() for f in all_files)
-        
-        # Monorepo detection
-        package_json_count = sum(1 for f in all_files if f.endswith('package.json'))
-        is_monorepo = package_json_count > 1 or any('lerna.json' in f or 'nx.json' in f for f in all_files)
-        
-        return {
-            "directories": {
-                "main_directories": sorted(list(directories))[:10],
-                "source_directories": [d for d in directories if any(src in d for src in ['src', 'lib', 'app'])],
-                "config_directories": [d for d in directories if any(cfg in d for cfg in ['config', 'conf', '.github'])],
-                "test_directories": [d for d in directories if any(test in d for test in ['test', 'spec', '__tests__'])],
-                "doc_directories": [d for d in directories if any(doc in d for doc in ['doc', 'docs', 'documentation'])]
-            },
-            "languages": {
-                "primary_language": repo_info.get('language', 'Unknown'),
-                "secondary_languages": languages_detected[:5],
-                "language_distribution": {lang: "estimated" for lang in languages_detected[:3]},
-                "frameworks_detected": []
-            },
-            "project_type": {
-                "architecture": "monorepo" if is_monorepo else "single-project",
-                "complexity": "moderate",
-                "domain": "unknown",
-                "scale": "unknown"
-            },
-            "features": {
-                "has_tests": has_tests,
-                "has_ci_cd": has_ci_cd,
-                "has_documentation": has_docs,
-                "has_docker": has_docker,
-                "has_database": False,
-                "has_api": False,
-                "has_frontend": any(ext in file_extensions for ext in ['.html', '.css', '.js', '.ts']),
-                "has_backend": any(ext in file_extensions for ext in ['.py', '.java', '.go', '.php'])
-            },
-            "monorepo_analysis": {
-                "is_monorepo": is_monorepo,
-                "workspace_tool": "unknown",
-                "packages": [],
-                "shared_dependencies": False
-            },
-            "build_system": {
-                "build_tools": [],
-                "package_managers": [],
-                "bundlers": [],
-                "task_runners": []
-            },
-            "deployment": {
-                "deployment_targets": [],
-                "containerization": "docker" if has_docker else "none",
-                "infrastructure_as_code": "none"
-            },
-            "quality_assurance": {
-                "linting": [],
-                "formatting": [],
-                "testing_frameworks": [],
-                "code_coverage": False
-            },
-            "insights": {
-                "architectural_patterns": [],
-                "notable_conventions": [],
-                "potential_improvements": [],
-                "estimated_team_size": "unknown",
-                "maintenance_level": "unknown",
-                "fallback_analysis": True
-            }
-        }
-
-    def _format_file_contents(self, file_contents: Dict[str, str]) -> str:
-        """
-        Format file contents for inclusion in AI prompts with clear delimiters and structure.
-
-        Args:
-            file_contents (Dict[str, str]): Dictionary mapping file paths to contents
-            
-        Returns:
-            str: Formatted string with clear file boundaries and metadata
-            
-        Note:
-            Uses consistent formatting to help AI models parse file contents:
-            - Clear start/end delimiters
-            - File path headers
-            - Content preservation with proper encoding
-        """
-        if not file_contents:
-            return "No file contents available for analysis."
-        
-        formatted_parts = []
-        
-        for file_path, content in file_contents.items():
-            # Add file header with metadata
-            file_size = len(content)
-            file_ext = os.path.splitext(file_path)[1]
-            
-            header = f"\n{'='*60}\nFILE: {file_path}\nSIZE: {file_size} characters\nTYPE: {file_ext or 'no extension'}\n{'='*60}"
-            footer = f"\n{'='*60}\nEND FILE: {file_path}\n{'='*60}\n"
-            
-            formatted_parts.append(f"{header}\n{content.strip()}\n{footer}")
-        
-        return "\n".join(formatted_parts)
-
-    def analyze_with_ai(self, repo_data: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Perform comprehensive AI analysis of the repository using custom or default prompts.
-
-        This is the main analysis method that takes the repository context and generates
-        detailed insights including build commands, development workflows, and architectural
-        recommendations.
-
-        Args:
-            repo_data (Dict[str, Any]): Repository context from get_full_repository_context()
-                Must contain: owner, repo, metadata, all_files, structure, file_contents
-                
-        Returns:
-            Dict[str, Any]: Comprehensive analysis dictionary containing:
-                - repository_analysis: Project type, technologies, architecture
-                - build_ecosystem: Build tools, package managers, bundlers
-                - commands: Detailed commands for all development scenarios  
-                - environment: Required versions and dependencies
-                - notes: Additional insights and recommendations
-                - recommended_workflow: Step-by-step development process
-                - error: Error message if analysis failed
-                
-        Note:
-            Falls back gracefully if AI analysis fails, returning error information
-            for debugging and user feedback.
-        """
-        # Validate input data
-        if 'error' in repo_data:
-            logger.error(f"Repository data contains error: {repo_data['error']}")
-            return repo_data
-
-        required_keys = ['owner', 'repo', 'metadata', 'file_contents', 'structure']
-        missing_keys = [key for key in required_keys if key not in repo_data]
-        if missing_keys:
-            error_msg = f"Missing required repository data keys: {missing_keys}"
-            logger.error(error_msg)
-            return {'error': error_msg}
-
-        try:
-            # Choose between custom and default prompt
-            if self.config.get('custom_prompt_template'):
-                logger.info("Using custom prompt template for analysis")
-                prompt = self._build_custom_prompt(repo_data)
-            else:
-                logger.info("Using default comprehensive prompt for analysis")
-                prompt = self._build_default_comprehensive_prompt(repo_data)
-            
-            logger.info(f"Starting AI analysis for {repo_data['owner']}/{repo_data['repo']}")
-            
-            # Call AI model with comprehensive prompt
-            ai_response = self._call_ai_model(prompt)
-            
-            if isinstance(ai_response, str):
-                try:
-                    # Extract JSON from AI response
-                    start_idx = ai_response.find('{')
-                    end_idx = ai_response.rfind('}') + 1
-                    
-                    if start_idx != -1 and end_idx > 0:
-                        json_str = ai_response[start_idx:end_idx]
-                        analysis_result = json.loads(json_str)
-                        
-                        # Add metadata to the analysis
-                        analysis_result['analysis_metadata'] = {
-                            'analyzer_version': Constants.APP_VERSION,
-                            'model_used': self.model,
-                            'analysis_timestamp': datetime.now().isoformat(),
-                            'repository': f"{repo_data['owner']}/{repo_data['repo']}",
-                            'files_analyzed': len(repo_data['file_contents']),
-                            'total_files': repo_data.get('total_files', 0)
-                        }
-                        
-                        logger.info("AI analysis completed successfully")
-                        return analysis_result
-                        
-                    else:
-                        raise ValueError("No valid JSON found in AI response")
-                        
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse AI response as JSON: {e}")
-                    logger.debug(f"AI response (first 500 chars): {ai_response[:500]}")
-                    return {
-                        'error': 'AI returned invalid JSON format',
-                        'error_details': str(e),
-                        'raw_response_preview': ai_response[:200] + '...' if len(ai_response) > 200 else ai_response
-                    }
-            else:
-                logger.error(f"Unexpected AI response type: {type(ai_response)}")
-                return {'error': 'Unexpected AI response format', 'response_type': str(type(ai_response))}
-
-        except Exception as e:
-            error_msg = f"AI analysis failed: {e}"
-            logger.error(error_msg)
-            return {
-                'error': error_msg,
-                'error_type': type(e).__name__,
-                'repository': f"{repo_data.get('owner', 'unknown')}/{repo_data.get('repo', 'unknown')}"
-            }
-
-    def _build_custom_prompt(self, repo_data: Dict[str, Any]) -> str:
-        """
-        Build a custom analysis prompt from user-provided template with variable substitution.
-
-        Args:
-            repo_data (Dict[str, Any]): Repository context data
-            
-        Returns:
-            str: Formatted custom prompt with all variables substituted
-            
-        Note:
-            Supported template variables:
-            - {REPO_NAME}: owner/repo format
-            - {DESCRIPTION}: Repository description
-            - {LANGUAGE}: Primary programming language
-            - {TOPICS}: Comma-separated topic tags
-            - {TOTAL_FILES}: Total file count
-            - {FILE_STRUCTURE}: Formatted file list
-            - {FILE_CONTENTS}: Formatted file contents
-            - {STRUCTURE_ANALYSIS}: JSON structure analysis
-            - {COMMAND_CATEGORIES}: Available command categories
-        """
-        template = self.config['custom_prompt_template']
-        
-        # Prepare all replacement variables
-        replacements = {
-            '{REPO_NAME}': f"{repo_data['owner']}/{repo_data['repo']}",
-            '{DESCRIPTION}': repo_data['metadata'].get('description', 'No description provided'),
-            '{LANGUAGE}': repo_data['metadata'].get('language', 'Not specified'),
-            '{TOPICS}': ', '.join(repo_data['metadata'].get('topics', [])) or 'None specified',
-            '{TOTAL_FILES}': str(repo_data.get('total_files', len(repo_data.get('all_files', [])))),
-            '{FILE_STRUCTURE}': '\n'.join(f"- {f}" for f in repo_data.get('all_files', [])[:Constants.MAX_FILES_IN_PROMPT]),
-            '{FILE_CONTENTS}': self._format_file_contents(repo_data.get('file_contents', {})),
-            '{STRUCTURE_ANALYSIS}': json.dumps(repo_data.get('structure', {}), indent=2),
-            '{COMMAND_CATEGORIES}': ', '.join(self.config['command_categories'])
-        }
-        
-        # Apply all replacements to template
-        formatted_prompt = template
-        for placeholder, value in replacements.items():
-            formatted_prompt = formatted_prompt.replace(placeholder, str(value))
-        
-        logger.debug(f"Built custom prompt with {len(replacements)} variable substitutions")
-        return formatted_prompt
-
-    def _build_default_comprehensive_prompt(self, repo_data: Dict[str, Any]) -> str:
-        """
-        Build the default comprehensive analysis prompt with all repository context.
-
-        Args:
-            repo_data (Dict[str, Any]): Repository context data
-            
-        Returns:
-            str: Comprehensive analysis prompt for AI model
-            
-        Note:
-            This prompt is designed to extract maximum value from repository analysis,
-            covering build systems, development workflows, deployment, and best practices.
-        """
-        # Format file contents and structure for prompt
-        file_contents_text = self._format_file_contents(repo_data.get('file_contents', {}))
-        structure_summary = json.dumps(repo_data.get('structure', {}), indent=2)
-        
-        # Prepare metadata
-        metadata = repo_data.get('metadata', {})
-        topics = metadata.get('topics', [])
-        topics_str = ', '.join(topics) if topics else 'None specified'
-        
-        # Build comprehensive prompt
-        prompt = f"""
-You are a world-class senior software engineer and DevOps architect with expertise across all programming languages, frameworks, build systems, and development workflows. Your task is to analyze this repository comprehensively and provide detailed, accurate, and actionable insights.
-
-REPOSITORY CONTEXT:
-Repository: {repo_data['owner']}/{repo_data['repo']}
-Description: {metadata.get('description', 'No description provided')}
-Primary Language: {metadata.get('language', 'Not detected')}
-Topics/Tags: {topics_str}
-Stars: {metadata.get('stargazers_count', 0):,}
-Forks: {metadata.get('forks_count', 0):,}
-Size: {metadata.get('size', 0):,} KB
-Created: {metadata.get('created_at', 'Unknown')}
-Last Updated: {metadata.get('updated_at', 'Unknown')}
-Default Branch: {metadata.get('default_branch', 'main')}
-Total Files: {repo_data.get('total_files', 0):,}
-Files Analyzed: {len(repo_data.get('file_contents', {})):,}
-
-REPOSITORY STRUCTURE ANALYSIS:
-{structure_summary}
-
-ANALYZED FILES AND CONTENTS:
-{file_contents_text}
+_ANALYSIS_SYSTEM_PROMPT = """
+You are a world-class senior software engineer and DevOps architect with expertise across all programming languages, frameworks, build systems, and development workflows. Your task is to analyze this repository comprehensively and provide detailed, accurate, and actionable insights.
 
 ANALYSIS INSTRUCTIONS:
 Provide a comprehensive analysis focusing on practical, executable insights. Be confident in your recommendations and provide specific commands that developers can immediately use. Consider the full development lifecycle from setup to deployment.
@@ -1573,8 +663,8 @@ SPECIAL CONSIDERATIONS:
 OUTPUT FORMAT:
 Return ONLY a valid JSON object with this exact structure (no markdown, no additional text):
 
-{{
-    "repository_analysis": {{
+{
+    "repository_analysis": {
         "primary_technology": "Main technology/framework",
         "technology_stack": ["comprehensive list of all technologies"],
         "framework_stack": ["all frameworks and libraries"],
@@ -1584,8 +674,8 @@ Return ONLY a valid JSON object with this exact structure (no markdown, no addit
         "deployment_targets": ["cloud platforms, containers, or deployment types"],
         "scalability_indicators": ["patterns suggesting scale requirements"],
         "security_features": ["security-related implementations found"]
-    }},
-    "build_ecosystem": {{
+    },
+    "build_ecosystem": {
         "primary_build_tool": "main build orchestrator",
         "package_managers": ["npm|yarn|pip|maven|gradle|cargo|go|composer|etc"],
         "bundlers": ["webpack|vite|rollup|parcel|esbuild|etc"],
@@ -1593,8 +683,8 @@ Return ONLY a valid JSON object with this exact structure (no markdown, no addit
         "task_runners": ["npm-scripts|gulp|grunt|make|invoke|etc"],
         "preprocessors": ["sass|less|postcss|etc"],
         "code_generators": ["tools that generate code or assets"]
-    }},
-    "commands": {{
+    },
+    "commands": {
         "environment_setup": "Command to set up development environment",
         "install_dependencies": "Install all required dependencies",  
         "install_dev_dependencies": "Install development-only dependencies",
@@ -1633,9 +723,9 @@ Return ONLY a valid JSON object with this exact structure (no markdown, no addit
         "ci_local": "Run CI pipeline locally",
         "release": "Create and publish a new release",
         "maintenance": "General maintenance tasks"
-    }},
-    "environment_requirements": {{
-        "runtime_versions": {{
+    },
+    "environment_requirements": {
+        "runtime_versions": {
             "java": "specific Java version required (e.g., '8', '11', '17', '21') or 'any'",
             "node": "specific Node.js version required (e.g., '16.x', '18.x', '20.x', 'latest')",
             "npm": "specific npm version required (e.g., '8.x', '9.x', '10.x') or 'latest'",
@@ -1648,8 +738,8 @@ Return ONLY a valid JSON object with this exact structure (no markdown, no addit
             "ruby": "specific Ruby version required (e.g., '3.0', '3.1', '3.2') or 'latest'",
             "kotlin": "specific Kotlin version required or 'latest'",
             "scala": "specific Scala version required (e.g., '2.13', '3.x') or 'latest'"
-        }},
-        "build_files_available": {{
+        },
+        "build_files_available": {
             "has_maven_wrapper": "true if mvnw/mvnw.cmd exists, false otherwise",
             "has_gradle_wrapper": "true if gradlew/gradlew.bat exists, false otherwise",
             "has_npm_scripts": "true if package.json has scripts section",
@@ -1672,8 +762,8 @@ Return ONLY a valid JSON object with this exact structure (no markdown, no addit
             "requirements_location": "path to requirements.txt file",
             "dockerfile_location": "path to Dockerfile if present",
             "makefile_location": "path to Makefile if present"
-        }},
-        "version_specifications": {{
+        },
+        "version_specifications": {
             "detected_from": ["list of files where version requirements were detected"],
             "java_source_target": "Java source/target version from pom.xml or build.gradle",
             "maven_compiler_version": "Maven compiler plugin version requirement",
@@ -1690,21 +780,21 @@ Return ONLY a valid JSON object with this exact structure (no markdown, no addit
             "ruby_version": "Ruby version from Gemfile or .ruby-version",
             "kotlin_version": "Kotlin version from build files",
             "scala_version": "Scala version from build.sbt or build.gradle"
-        }},
+        },
         "system_dependencies": ["system-level packages required"],
         "environment_variables": ["required environment variables"],
         "optional_tools": ["recommended but not required tools"],
         "ide_recommendations": ["recommended IDEs and extensions"]
-    }},
-    "development_workflow": {{
+    },
+    "development_workflow": {
         "setup_steps": ["ordered list of initial setup steps"],
         "daily_workflow": ["typical development workflow steps"],
         "testing_strategy": "Description of testing approach and best practices",
         "code_quality": "Code quality tools and processes in use",
         "collaboration": "Team collaboration tools and practices",
         "release_process": "How releases are created and deployed"
-    }},
-    "insights_and_recommendations": {{
+    },
+    "insights_and_recommendations": {
         "architectural_strengths": ["positive aspects of current architecture"],
         "potential_improvements": ["specific suggestions for improvement"],
         "security_considerations": ["security-related observations and recommendations"], 
@@ -1713,21 +803,21 @@ Return ONLY a valid JSON object with this exact structure (no markdown, no addit
         "scalability_assessment": "How well the project handles scale",
         "technology_modernization": ["suggestions for tech stack updates"],
         "best_practices_compliance": "Adherence to industry best practices"
-    }},
-    "troubleshooting": {{
+    },
+    "troubleshooting": {
         "common_issues": ["typical problems developers might encounter"],
         "debugging_commands": ["commands useful for debugging issues"],
         "log_locations": ["where to find relevant log files"],
         "health_checks": ["commands to verify system health"]
-    }},
-    "metadata": {{
+    },
+    "metadata": {
         "confidence_score": "high|medium|low - confidence in analysis accuracy",
         "analysis_completeness": "complete|partial|limited - how complete the analysis is",
         "recommendations_priority": "high|medium|low - urgency of applying recommendations",
         "maintenance_burden": "low|medium|high - estimated ongoing maintenance needs",
         "learning_curve": "easy|moderate|steep - difficulty for new developers"
-    }}
-}}
+    }
+}
 
 CRITICAL REQUIREMENTS:
 1. All commands must be executable and tested-worthy
@@ -1769,48 +859,2769 @@ RUST PROJECTS:
 - Look for rust-toolchain.toml or rust-toolchain files
 - Check .rustc_version files
 
-.NET PROJECTS:
-- Examine .csproj, .fsproj files for <TargetFramework>
-- Check global.json for SDK version requirements
-- Look for Dockerfile FROM mcr.microsoft.com/dotnet
+.NET PROJECTS:
+- Examine .csproj, .fsproj files for <TargetFramework>
+- Check global.json for SDK version requirements
+- Look for Dockerfile FROM mcr.microsoft.com/dotnet
+
+PHP PROJECTS:
+- Check composer.json require php version
+- Look for .php-version files
+- Check Dockerfile FROM php:XX
+
+RUBY PROJECTS:
+- Examine Gemfile ruby statement
+- Check .ruby-version, .rvmrc files
+- Look for Dockerfile FROM ruby:XX
+
+BUILD WRAPPER & TOOL DETECTION:
+- Maven: mvnw vs system mvn, wrapper generation capability
+- Gradle: gradlew vs system gradle
+- Node.js: npm vs yarn vs pnpm (check lock files)
+- Python: pip vs poetry vs pipenv (check pyproject.toml, Pipfile)
+- .NET: dotnet commands, package restore
+- PHP: composer vs system package managers
+- Ruby: bundler vs gem
+- Go: go mod vs GOPATH mode
+- Rust: cargo commands
+
+VERSION CONSTRAINT FILES:
+- .tool-versions (asdf), .envrc (direnv)
+- Docker files with specific base image versions
+- CI files (.github/workflows) with setup-* actions specifying versions
+
+Base your analysis on the actual files and structure provided, not generic assumptions.
+"""
+
+_ANALYSIS_PROMPT_TEMPLATE = """
+REPOSITORY CONTEXT:
+Repository: {repository}
+Description: {description}
+Primary Language: {language}
+Topics/Tags: {topics}
+Stars: {stars}
+Forks: {forks}
+Size: {size} KB
+Created: {created_at}
+Last Updated: {updated_at}
+Default Branch: {default_branch}
+Total Files: {total_files}
+Files Analyzed: {analyzed_files}
+
+REPOSITORY STRUCTURE ANALYSIS:
+{structure_summary}
+
+ANALYZED FILES AND CONTENTS:
+"""
+
+# Initialize logging with proper configuration
+def setup_logging() -> str:
+    """
+    Set up logging configuration with both console and file handlers.
+    
+    Returns:
+        str: Path to the log file created
+        
+    Note:
+        Creates timestamped log files to avoid conflicts in concurrent runs.
+        File writes happen on a background QueueListener thread, so logging
+        from the fetch workers never blocks on disk I/O. Console output stays
+        synchronous to keep it ordered with the CLI's print() output.
+    """
+    timestamp = datetime.now().strftime(Constants.TIMESTAMP_FORMAT)
+    log_filename = f"{Constants.LOG_FILE_PREFIX}{timestamp}.log"
+    
+    # Create logs directory if it doesn't exist
+    log_dir = Path('logs')
+    log_dir.mkdir(exist_ok=True)
+    log_path = log_dir / log_filename
+    
+    # File output is written by a listener thread fed through an unbounded queue;
+    # records arrive already formatted by the QueueHandler configured below
+    file_handler = logging.FileHandler(log_path, encoding='utf-8')
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # Configure logging with detailed format
+    logging.basicConfig(
+        level=getattr(logging, Constants.LOG_LEVEL),
+        format=Constants.LOG_FORMAT,
+        handlers=[
+            logging.StreamHandler(sys.stdout),  # Console output
+            logging.handlers.QueueHandler(log_queue)  # File output
+        ]
+    )
+    
+    # Set third-party library log levels to reduce noise
+    logging.getLogger('requests').setLevel(logging.WARNING)
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+    logging.getLogger('openai').setLevel(logging.WARNING)
+    
+    return str(log_path)
+
+# Initialize logger
+log_file_path = setup_logging()
+logger = logging.getLogger(__name__)
+
+class RepositoryAnalyzerError(Exception):
+    """Base exception class for repository analyzer errors."""
+    pass
+
+class GitHubAPIError(RepositoryAnalyzerError):
+    """Exception raised for GitHub API related errors."""
+    pass
+
+class AIModelError(RepositoryAnalyzerError):
+    """Exception raised for AI model related errors."""
+    pass
+
+class ConfigurationError(RepositoryAnalyzerError):
+    """Exception raised for configuration related errors."""
+    pass
+
+class GitHubRateLimiter:
+    """
+    Thread-safe tracker of GitHub API rate-limit state shared by all requests.
+
+    Every response updates the tracker from its X-RateLimit-Remaining,
+    X-RateLimit-Reset and Retry-After headers. Callers invoke wait() before
+    each request so concurrent workers pause together, instead of each one
+    running into 403 responses.
+
+    Attributes:
+        remaining (int, optional): Requests left in the current window, if known
+        reset_at (float): Epoch seconds at which the current window resets
+    """
+
+    def __init__(self, buffer: int = Constants.GITHUB_RATE_LIMIT_BUFFER,
+                 max_wait: float = Constants.GITHUB_MAX_RATE_LIMIT_WAIT):
+        """
+        Initialize the limiter.
+
+        Args:
+            buffer (int): Remaining-request threshold at which requests are paused
+            max_wait (float): Longest pause in seconds; longer waits are not taken
+        """
+        self.buffer = buffer
+        self.max_wait = max_wait
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """
+        Block until it is reasonable to issue another request.
+
+        Note:
+            If the required pause exceeds max_wait the request is let through
+            so that the caller surfaces the rate-limit error instead of hanging.
+        """
+        with self._lock:
+            now = time.time()
+            delay = self._blocked_until - now
+            if self.remaining is not None and self.remaining <= self.buffer:
+                delay = max(delay, self.reset_at - now)
+
+        if delay <= 0:
+            return
+        if delay > self.max_wait:
+            logger.warning(f"GitHub rate limit resets in {int(delay)}s; not waiting")
+            return
+
+        logger.warning(f"GitHub rate limit nearly exhausted, pausing {delay:.1f}s")
+        time.sleep(delay)
+
+    def update(self, response: requests.Response) -> None:
+        """
+        Record rate-limit state from a GitHub API response.
+
+        Args:
+            response (requests.Response): Response whose headers to inspect
+
+        Note:
+            The remaining/reset counters track the REST ("core") quota that
+            wait() paces against; GraphQL responses report a separate point
+            budget, so only their secondary-limit Retry-After is recorded.
+        """
+        headers = response.headers
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        retry_after = headers.get('Retry-After')
+        if headers.get('X-RateLimit-Resource', 'core') != 'core':
+            remaining = reset = None
+
+        with self._lock:
+            if remaining is not None and remaining.isdigit():
+                self.remaining = int(remaining)
+            if reset is not None and reset.isdigit():
+                self.reset_at = float(reset)
+            # Secondary rate limits: block every worker for the advertised duration
+            if retry_after is not None and retry_after.isdigit() and response.status_code in (403, 429):
+                self._blocked_until = max(self._blocked_until, time.time() + int(retry_after))
+
+    @staticmethod
+    def is_rate_limited(response: requests.Response) -> bool:
+        """
+        Check whether a response was rejected by a primary or secondary rate limit.
+
+        Args:
+            response (requests.Response): Response to inspect
+
+        Returns:
+            bool: True for 429s and for 403s that carry rate-limit signals
+        """
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        return (
+            'Retry-After' in response.headers
+            or response.headers.get('X-RateLimit-Remaining') == '0'
+            or 'rate limit' in response.text.lower()
+        )
+
+    @staticmethod
+    def retry_delay(attempt: int, response: Optional[requests.Response] = None) -> float:
+        """
+        Compute how long to wait before retrying a request.
+
+        Args:
+            attempt (int): Zero-based number of the attempt that just failed
+            response (requests.Response, optional): The failed response, if any
+
+        Returns:
+            float: Seconds to sleep. Retry-After is honored exactly; an exhausted
+            primary limit waits until X-RateLimit-Reset (plus up to a second of
+            jitter); anything else uses full-jitter exponential backoff.
+        """
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+            reset = response.headers.get('X-RateLimit-Reset')
+            if response.headers.get('X-RateLimit-Remaining') == '0' and reset and reset.isdigit():
+                return max(0.0, int(reset) - time.time()) + random.uniform(0, 1)
+        return random.uniform(0, min(Constants.GITHUB_BACKOFF_CAP, Constants.GITHUB_BACKOFF_BASE * 2 ** attempt))
+
+
+class TreeEntries:
+    """
+    Blob entries of a repository tree stored as parallel arrays.
+
+    Paths live in a list, SHA-1s packed as 20 raw bytes each in one bytearray,
+    and sizes in an unsigned 64-bit array. For trees with tens of thousands of
+    files this takes a fraction of the memory of one dict per entry.
+
+    Note:
+        get() materializes a {'path', 'sha', 'size'} dict for a single entry;
+        the path-to-index map behind it is built on first lookup.
+    """
+
+    __slots__ = ('paths', 'shas', 'sizes', '_index')
+
+    SHA_BYTES = 20
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self.shas = bytearray()
+        self.sizes = array('Q')
+        self._index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def append(self, path: str, sha: str, size: int) -> None:
+        """
+        Add one blob entry.
+
+        Args:
+            path (str): File path relative to the repository root
+            sha (str): 40-character hex blob SHA
+            size (int): Blob size in bytes
+        """
+        self.paths.append(path)
+        self.shas += bytes.fromhex(sha)
+        self.sizes.append(size)
+        self._index = None
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an entry by path.
+
+        Args:
+            path (str): File path relative to the repository root
+
+        Returns:
+            Optional[Dict[str, Any]]: Entry with 'path', 'sha' and 'size' keys,
+            or None if the path is not in the tree
+        """
+        if self._index is None:
+            self._index = {p: i for i, p in enumerate(self.paths)}
+        i = self._index.get(path)
+        if i is None:
+            return None
+        offset = i * self.SHA_BYTES
+        return {
+            'path': path,
+            'sha': self.shas[offset:offset + self.SHA_BYTES].hex(),
+            'size': self.sizes[i]
+        }
+
+    def to_json(self) -> str:
+        """
+        Serialize the entries for the on-disk cache.
+
+        Returns:
+            str: JSON object with 'paths', hex-encoded 'shas' and 'sizes'
+        """
+        return _json_dumps({'paths': self.paths, 'shas': self.shas.hex(), 'sizes': self.sizes.tolist()})
+
+    @classmethod
+    def from_json(cls, data: Union[str, bytes]) -> 'TreeEntries':
+        """
+        Rebuild entries serialized by to_json().
+
+        Args:
+            data (Union[str, bytes]): Cached JSON document
+
+        Returns:
+            TreeEntries: The restored entries
+
+        Raises:
+            ValueError: If the document is corrupt or inconsistent
+        """
+        raw = _json_loads(data)
+        entries = cls()
+        entries.paths = raw['paths']
+        entries.shas = bytearray.fromhex(raw['shas'])
+        entries.sizes = array('Q', raw['sizes'])
+        if len(entries.sizes) != len(entries.paths) or len(entries.shas) != len(entries.paths) * cls.SHA_BYTES:
+            raise ValueError("Inconsistent cached tree entries")
+        return entries
+
+
+class JsonBoundaryScanner:
+    """
+    Find where the first top-level JSON value in streamed text ends.
+
+    Text is fed chunk by chunk. Scanning starts at the first occurrence of the
+    opening character and tracks bracket depth over both objects and arrays,
+    ignoring brackets inside string literals.
+
+    Attributes:
+        opener (str): '{' or '[', the character that starts the value
+    """
+
+    def __init__(self, opener: str):
+        """
+        Initialize the scanner.
+
+        Args:
+            opener (str): '{' for an object or '[' for an array
+        """
+        self.opener = opener
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> int:
+        """
+        Scan the next chunk of text.
+
+        Args:
+            chunk (str): Text following everything fed so far
+
+        Returns:
+            int: Offset in chunk just past the closing bracket of the value,
+            or -1 if the value has not closed yet
+        """
+        start = 0
+        if not self._started:
+            start = chunk.find(self.opener)
+            if start == -1:
+                return -1
+            self._started = True
+
+        for i in range(start, len(chunk)):
+            char = chunk[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    return i + 1
+        return -1
+
+
+class DiskCache:
+    """
+    Small file-per-key cache used for content-addressed GitHub data.
+
+    Keys are relative paths under the cache root. Writes are atomic
+    (temporary file plus os.replace) so concurrent workers and interrupted
+    runs never leave partial entries behind. Reads refresh the entry's mtime,
+    which trim() uses to evict least recently used entries.
+
+    Note:
+        Cache failures are logged and otherwise ignored; a broken cache only
+        costs the network round-trip it would have saved.
+    """
+
+    def __init__(self, root: Path, max_size_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            root (Path): Cache root directory (created lazily on first write)
+            max_size_bytes (int): Total size trim() keeps the cache under
+        """
+        self.root = root
+        self.max_size_bytes = max_size_bytes
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read a cached entry.
+
+        Args:
+            key (str): Relative path of the entry
+
+        Returns:
+            Optional[bytes]: Entry contents, or None on a miss
+        """
+        path = self.root / key
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.debug(f"Cache read failed for {key}: {e}")
+            return None
+
+    def set(self, key: str, data: bytes) -> None:
+        """
+        Atomically write a cache entry.
+
+        Args:
+            key (str): Relative path of the entry
+            data (bytes): Contents to store
+        """
+        path = self.root / key
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.debug(f"Cache write failed for {key}: {e}")
+
+    def trim(self) -> None:
+        """Evict least recently used entries until the cache fits max_size_bytes."""
+        try:
+            entries = []
+            total_size = 0
+            for path in self.root.rglob('*'):
+                if path.is_file():
+                    stat = path.stat()
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total_size += stat.st_size
+        except OSError as e:
+            logger.debug(f"Cache scan failed: {e}")
+            return
+
+        if total_size <= self.max_size_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total_size -= size
+            if total_size <= self.max_size_bytes:
+                break
+        logger.debug(f"Trimmed cache to {total_size} bytes")
+
+
+class LLMCache:
+    """
+    Persistent cache of AI responses with embedding-based near-duplicate lookup.
+
+    Lookups first try an exact key (sha256 of namespace, model, temperature
+    and prompt). On a miss, the prompt is embedded and compared against stored
+    embeddings in the same namespace and model; a cosine similarity at or above
+    the threshold returns the stored response. Namespaces keep different kinds
+    of call (e.g. file selection vs. structure analysis for the same repository,
+    whose prompts embed very similarly) from answering each other. Entries
+    live in a SQLite database.
+
+    Note:
+        A connection is opened per operation so the cache can be used from
+        any thread. Embedding or database failures are treated as misses.
+    """
+
+    def __init__(self, db_path: Path, client: Any, embedding_model: str, threshold: float):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path (Path): SQLite database file (created on first use)
+            client (Any): OpenAI-compatible client used for embeddings
+            embedding_model (str): Embedding model name
+            threshold (float): Minimum cosine similarity for a semantic hit
+        """
+        self.db_path = db_path
+        self.client = client
+        self.embedding_model = embedding_model
+        self.threshold = threshold
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating the schema if needed."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, namespace TEXT NOT NULL, model TEXT NOT NULL, response TEXT NOT NULL, '
+            'embedding BLOB, created REAL NOT NULL)'
+        )
+        return conn
+
+    @staticmethod
+    def _key(namespace: str, model: str, prompt: str) -> str:
+        """Exact-match key for a (namespace, model, temperature, prompt) tuple."""
+        payload = f"{namespace}\0{model}\0{Constants.AI_TEMPERATURE}\0{prompt}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def _embed(self, prompt: str) -> Optional[array]:
+        """
+        Embed a prompt and L2-normalize the vector.
+
+        Args:
+            prompt (str): Prompt text; only a bounded prefix is embedded
+
+        Returns:
+            Optional[array]: Unit-length float vector, or None if embedding failed
+        """
+        try:
+            response = self.client.embeddings.create(
+                model=self.embedding_model,
+                input=prompt[:Constants.SEMANTIC_CACHE_MAX_EMBED_CHARS]
+            )
+            vector = response.data[0].embedding
+        except Exception as e:
+            logger.debug(f"Semantic cache embedding failed: {e}")
+            return None
+
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return array('f', (x / norm for x in vector))
+
+    def get(self, namespace: str, model: str, prompt: str) -> Tuple[Optional[str], Optional[array]]:
+        """
+        Look up a cached response.
+
+        Args:
+            namespace (str): Kind of call the prompt belongs to
+            model (str): Provider model name
+            prompt (str): Prompt text
+
+        Returns:
+            Tuple[Optional[str], Optional[array]]: Cached response (None on a
+            miss) and the prompt embedding computed for the lookup, which
+            put() reuses so a miss costs only one embedding call
+        """
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    'SELECT response FROM responses WHERE key = ?', (self._key(namespace, model, prompt),)
+                ).fetchone()
+                if row:
+                    logger.info("AI response served from cache (exact match)")
+                    return row[0], None
+
+                embedding = self._embed(prompt)
+                if embedding is None:
+                    return None, None
+
+                best_score, best_response = 0.0, None
+                for response_text, blob in conn.execute(
+                    'SELECT response, embedding FROM responses '
+                    'WHERE namespace = ? AND model = ? AND embedding IS NOT NULL',
+                    (namespace, model)
+                ):
+                    stored = array('f')
+                    stored.frombytes(blob)
+                    if len(stored) != len(embedding):
+                        continue
+                    score = sum(a * b for a, b in zip(embedding, stored))
+                    if score > best_score:
+                        best_score, best_response = score, response_text
+
+                if best_response is not None and best_score >= self.threshold:
+                    logger.info(f"AI response served from cache (similarity {best_score:.3f})")
+                    return best_response, embedding
+                return None, embedding
+
+        except sqlite3.Error as e:
+            logger.debug(f"Semantic cache lookup failed: {e}")
+            return None, None
+
+    def put(self, namespace: str, model: str, prompt: str, response: str,
+            embedding: Optional[array] = None) -> None:
+        """
+        Store a response.
+
+        Args:
+            namespace (str): Kind of call the prompt belongs to
+            model (str): Provider model name
+            prompt (str): Prompt text
+            response (str): AI response to cache
+            embedding (array, optional): Prompt embedding from get(), if any
+        """
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, namespace, model, response, embedding, created) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (self._key(namespace, model, prompt), namespace, model, response,
+                     embedding.tobytes() if embedding is not None else None, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.debug(f"Semantic cache write failed: {e}")
+
+
+class UniversalRepoAnalyzer:
+    """
+    Universal Repository Analyzer using AI for comprehensive project analysis.
+    
+    This class provides functionality to:
+    1. Fetch repository structure and content from GitHub
+    2. Analyze project architecture using AI models
+    3. Generate build commands and development workflows
+    4. Handle various project types including monorepos and multi-language projects
+    
+    Attributes:
+        github_token (str): GitHub API token for authentication
+        model (str): AI model identifier (e.g., 'claude-sonnet', 'gpt-4')
+        config (Mapping[str, Any]): Configuration (read-only defaults unless a config file was merged)
+        api_key (str): API key for the selected AI model
+        base_url (str): Base URL for AI API calls
+        client (OpenAI): OpenAI-compatible client for AI API calls
+        
+    Raises:
+        ConfigurationError: When required configuration is missing or invalid
+        GitHubAPIError: When GitHub API calls fail
+        AIModelError: When AI model calls fail
+    """
+
+    def __init__(self, model: str = Constants.DEFAULT_MODEL, config_file: Optional[str] = None,
+                 use_ai: bool = True):
+        """
+        Initialize the analyzer with model and optional configuration file.
+
+        Args:
+            model (str): AI model to use (e.g., 'claude-sonnet', 'gpt-4', 'gemini')
+            config_file (str, optional): Path to configuration file (TOML, YAML, or JSON)
+            use_ai (bool): When False no AI client is created and no API key is
+                needed; file selection and structure analysis use the heuristics
+                and analyze_with_ai() is unavailable
+            
+        Raises:
+            ConfigurationError: If API client initialization fails or required keys are missing
+            
+        Example:
+            >>> analyzer = UniversalRepoAnalyzer('claude-sonnet', 'config.toml')
+            >>> context = analyzer.get_full_repository_context('https://github.com/owner/repo')
+        """
+        logger.info(f"Initializing {Constants.APP_NAME} v{Constants.APP_VERSION}")
+        logger.info(f"Log file: {log_file_path}")
+        
+        # Validate and normalize model name
+        self.model = self._normalize_model_name(model)
+        logger.info(f"Using AI model: {self.model}")
+        
+        # Load configuration
+        self.config = self._load_config(config_file)
+        
+        # Precompute file filtering rules once per analyzer
+        self._excluded_dirs = frozenset(self.config.get('excluded_directories', []))
+        self._excluded_suffixes = tuple(self.config.get('excluded_file_extensions', []))
+        self._allowed_suffixes = frozenset(Constants.SUPPORTED_EXTENSIONS) | {''}
+        # Cached trees are stored pre-filtered, so key them by the rules applied
+        self._filter_fingerprint = hashlib.sha256(
+            f"{sorted(self._excluded_dirs)}|{self._excluded_suffixes}|{sorted(self._allowed_suffixes)}".encode('utf-8')
+        ).hexdigest()[:12]
+        
+        # Setup GitHub authentication
+        self.github_token = os.getenv(Constants.GITHUB_TOKEN_ENV)
+        if not self.github_token:
+            logger.warning(
+                f"{Constants.GITHUB_TOKEN_ENV} not set. "
+                "GitHub API rate limits will apply (60 requests/hour vs 5000/hour authenticated)"
+            )
+        self.rate_limiter = GitHubRateLimiter()
+        self._http = self._create_github_session()
+        
+        # Setup on-disk cache for immutable GitHub data
+        self.cache = None
+        if self.config.get('enable_cache', True):
+            cache_dir = Path(self.config.get('cache_dir') or Constants.DEFAULT_CACHE_DIR).expanduser()
+            self.cache = DiskCache(cache_dir, Constants.CACHE_MAX_SIZE_MB * 1024 * 1024)
+        
+        # Setup AI client
+        self.use_ai = use_ai
+        self.client = None
+        if use_ai:
+            try:
+                self.api_key = self._get_api_key_for_model()
+                self.base_url = self._get_base_url_for_model()
+                
+                # Imported here rather than at module level: the SDK is by far the
+                # slowest import, and --help or argument errors never need it
+                import openai
+                self._bad_request_error = openai.BadRequestError
+                self.client = openai.OpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url
+                )
+                logger.info(f"Initialized AI client for {self.model} with base_url: {self.base_url}")
+                
+            except Exception as e:
+                logger.error(f"Failed to initialize AI client: {e}")
+                raise ConfigurationError(f"Cannot initialize AI client for {self.model}: {e}")
+        else:
+            logger.info("AI disabled: using heuristic file selection and structure analysis")
+        
+        # Replies that only need their JSON are streamed unless the endpoint refuses
+        self._ai_streaming = True
+        
+        # Steps of the current context build that fell back or came back partial;
+        # such a context is not cached, so a later run at the same commit retries
+        self._degraded_steps: List[str] = []
+        
+        # In-process memo of AI responses, keyed by a hash of model and messages
+        self._ai_memo: 'collections.OrderedDict[bytes, str]' = collections.OrderedDict()
+        
+        # Prompt embeddings from semantic cache misses, awaiting a parsed reply
+        self._pending_embeddings: Dict[bytes, array] = {}
+        
+        # Joined once for the {COMMAND_CATEGORIES} placeholder
+        self._command_categories_text = ', '.join(self.config['command_categories'])
+        
+        # Setup semantic cache for repeatable AI calls
+        self.llm_cache = None
+        if self.client is not None and self.config.get('enable_semantic_cache'):
+            self.llm_cache = LLMCache(
+                Path(Constants.SEMANTIC_CACHE_PATH).expanduser(),
+                self.client,
+                self.config.get('semantic_cache_embedding_model', Constants.SEMANTIC_CACHE_EMBEDDING_MODEL),
+                float(self.config.get('semantic_cache_threshold', Constants.SEMANTIC_CACHE_THRESHOLD))
+            )
+
+    def _normalize_model_name(self, model: str) -> str:
+        """
+        Normalize and validate the model name.
+        
+        Args:
+            model (str): Raw model name from user input
+            
+        Returns:
+            str: Normalized model name
+            
+        Raises:
+            ConfigurationError: If model name is not supported
+        """
+        normalized = _normalize_model_key(model)
+        
+        # Check if it's a valid model
+        if normalized is None:
+            available_models = list(Constants.MODEL_NAME_MAP.keys())
+            logger.error(f"Unsupported model '{model}'. Available models: {available_models}")
+            raise ConfigurationError(f"Unsupported model '{model}'. Available: {available_models}")
+        
+        return normalized
+
+    def _get_api_key_for_model(self) -> str:
+        """
+        Get the universal AI API key from environment variable.
+
+        Returns:
+            str: AI API key for all providers
+
+        Raises:
+            ConfigurationError: If the AI API key is not set
+
+        Note:
+            Uses a single AI_API_KEY environment variable for all AI providers.
+            This simplifies configuration while supporting all models.
+        """
+        api_key = os.getenv(Constants.AI_API_KEY_ENV)
+
+        if not api_key:
+            logger.error(f"Required environment variable {Constants.AI_API_KEY_ENV} not set")
+            raise ConfigurationError(
+                f"{Constants.AI_API_KEY_ENV} not set in environment. "
+                f"Please set this environment variable with your API key. "
+                f"This single key will be used for all AI models ({self.model})."
+            )
+
+        # Validate API key format (basic check)
+        if len(api_key.strip()) < 10:
+            logger.warning(f"API key seems too short. Please verify your {Constants.AI_API_KEY_ENV}.")
+
+        return api_key
+
+    def _get_base_url_for_model(self) -> str:
+        """
+        Get the base URL for API calls, checking config, environment, then defaults.
+
+        Returns:
+            str: Base URL for the selected model
+
+        Note:
+            Priority order:
+            1. Configuration file setting for 'base_url'
+            2. Environment variable AI_API_BASE_URL
+            3. Default hardcoded URL (same for all models)
+        """
+        base_url, source = _resolve_base_url(
+            self.config.get('api_base_urls', {}).get('base_url'),
+            os.getenv('AI_API_BASE_URL')
+        )
+        logger.info(f"Using base URL from {source}: {base_url}")
+        return base_url
+
+    def _load_config(self, config_file: Optional[str]) -> Mapping[str, Any]:
+        """
+        Load configuration from file or use defaults. Supports TOML, YAML, and JSON.
+
+        Args:
+            config_file (str, optional): Path to configuration file
+            
+        Returns:
+            Mapping[str, Any]: Configuration mapping with defaults applied
+            
+        Note:
+            Configuration file format is auto-detected based on file extension:
+            - .toml -> TOML format
+            - .yml/.yaml -> YAML format  
+            - .json -> JSON format
+            
+            If loading fails, defaults are used and a warning is logged.
+            Without a usable config file a read-only view of DEFAULT_CONFIG is
+            returned instead of a copy; user settings are merged into a deep
+            copy so nested defaults are never shared or mutated.
+        """
+        config = types.MappingProxyType(Constants.DEFAULT_CONFIG)
+
+        if not config_file:
+            logger.info("No configuration file specified, using defaults")
+            return config
+
+        config_path = Path(config_file)
+        if not config_path.exists():
+            logger.warning(f"Configuration file {config_file} not found, using defaults")
+            return config
+
+        try:
+            content = config_path.read_text(encoding='utf-8')
+            file_extension = config_path.suffix.lower()
+
+            if file_extension == '.toml':
+                user_config = self._parse_toml(content)
+            elif file_extension in ['.yml', '.yaml']:
+                user_config = self._parse_yaml(content)
+            elif file_extension == '.json':
+                user_config = _json_loads(content)
+            else:
+                # Try to auto-detect format by content
+                if content.strip().startswith('{'):
+                    user_config = _json_loads(content)
+                elif '=' in content and '[' in content:
+                    user_config = self._parse_toml(content)
+                else:
+                    user_config = self._parse_yaml(content)
+
+            # Merge user config with defaults
+            merged = copy.deepcopy(Constants.DEFAULT_CONFIG)
+            merged.update(user_config)
+
+            # Validate critical config values
+            self._validate_config(merged)
+            logger.info(f"Successfully loaded configuration from {config_file}")
+            config = merged
+
+        except Exception as e:
+            logger.error(f"Failed to load configuration file {config_file}: {e}")
+            logger.info("Continuing with default configuration")
+
+        return config
+
+    @staticmethod
+    def _parse_toml(content: str) -> Dict[str, Any]:
+        """
+        Parse TOML configuration text.
+
+        Args:
+            content (str): TOML document
+
+        Returns:
+            Dict[str, Any]: Parsed configuration
+
+        Note:
+            Imported on demand so runs without a TOML config never load a parser.
+            Uses the built-in tomllib on Python 3.11+ and falls back to toml.
+        """
+        if sys.version_info >= (3, 11):
+            import tomllib
+            return tomllib.loads(content)
+        import toml
+        return toml.loads(content)
+
+    @staticmethod
+    def _parse_yaml(content: str) -> Any:
+        """
+        Parse YAML configuration text.
+
+        Args:
+            content (str): YAML document
+
+        Returns:
+            Any: Parsed configuration
+
+        Note:
+            Imported on demand so runs without a YAML config never load PyYAML.
+            Uses the libyaml-backed CSafeLoader when PyYAML was built with it.
+        """
+        import yaml
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        return yaml.load(content, Loader=loader)
+
+    def _validate_config(self, config: Dict[str, Any]) -> None:
+        """
+        Validate configuration values and apply reasonable limits.
+        
+        Args:
+            config (Dict[str, Any]): Configuration dictionary to validate
+            
+        Note:
+            Modifies config in-place to ensure values are within reasonable bounds.
+        """
+        # Ensure numeric values are within reasonable bounds
+        if config.get('max_files_to_analyze', 0) > 200:
+            logger.warning("max_files_to_analyze too high, capping at 200")
+            config['max_files_to_analyze'] = 200
+        
+        if config.get('max_file_size', 0) > 50000:
+            logger.warning("max_file_size too high, capping at 50000 characters")
+            config['max_file_size'] = 50000
+        
+        # Ensure required lists exist
+        if not isinstance(config.get('command_categories'), list):
+            config['command_categories'] = list(Constants.DEFAULT_CONFIG['command_categories'])
+        
+        if not isinstance(config.get('excluded_directories'), list):
+            config['excluded_directories'] = list(Constants.DEFAULT_CONFIG['excluded_directories'])
+
+    def _parse_github_url(self, repo_url: str) -> Tuple[str, str]:
+        """
+        Parse GitHub repository URL to extract owner and repository name.
+        
+        Args:
+            repo_url (str): GitHub repository URL
+            
+        Returns:
+            Tuple[str, str]: (owner, repository_name)
+            
+        Raises:
+            ValueError: If URL format is invalid
+            
+        Example:
+            >>> owner, repo = self._parse_github_url('https://github.com/owner/repo.git')
+            >>> print(f"{owner}/{repo}")  # outputs: owner/repo
+        """
+        try:
+            # Single match handles the URL forms and validates owner/repo names
+            match = _GH_URL_RE.match(repo_url.strip())
+            if not match:
+                raise ValueError(f"Expected format: owner/repo, got: {repo_url}")
+            
+            owner, repo = match.group(1), match.group(2)
+            
+            logger.debug(f"Parsed GitHub URL: {owner}/{repo}")
+            return owner, repo
+            
+        except Exception as e:
+            logger.error(f"Failed to parse GitHub URL '{repo_url}': {e}")
+            raise ValueError(f"Invalid GitHub URL format: {repo_url}. Expected: https://github.com/owner/repo")
+
+    def get_full_repository_context(self, repo_url: str) -> Dict[str, Any]:
+        """
+        Fetch comprehensive repository context using AI-driven discovery.
+
+        This method orchestrates the complete repository analysis process:
+        1. Fetches repository metadata from GitHub API
+        2. Retrieves complete file tree structure
+        3. Uses AI to select important files for analysis
+        4. Downloads content of selected files
+        5. Performs AI-driven structure analysis
+
+        Args:
+            repo_url (str): GitHub repository URL
+            
+        Returns:
+            Dict[str, Any]: Repository context dictionary containing:
+                - owner (str): Repository owner
+                - repo (str): Repository name  
+                - metadata (Dict): Repository metadata from GitHub API
+                - all_files (List[str]): Complete list of file paths
+                - structure (Dict): AI-generated structure analysis
+                - file_contents (Dict[str, str]): Content of analyzed files
+                - total_files (int): Total number of files in repository
+                - analyzed_files (int): Number of files actually analyzed
+                - error (str): Error message if analysis failed
+                
+        Note:
+            If any step fails, returns a dictionary with an 'error' key
+            containing the error message.
+        """
+        self._degraded_steps = []
+        try:
+            # Parse and validate GitHub URL
+            owner, repo = self._parse_github_url(repo_url)
+            logger.info(f"Starting analysis for {owner}/{repo}")
+            
+            # Setup request headers for GitHub API
+            headers = self._get_github_headers()
+            
+            # Step 1: Fetch repository metadata
+            logger.info("Fetching repository metadata...")
+            repo_info = self._fetch_repo_info(owner, repo, headers)
+            if not repo_info:
+                raise GitHubAPIError("Failed to fetch repository metadata")
+            
+            # Resolve the default branch head so cached data can be keyed by it
+            head_sha = self._fetch_head_sha(owner, repo, repo_info.get('default_branch'), headers)
+            
+            # A commit that was fully analyzed before needs no further fetching
+            context_key = self._context_cache_key(owner, repo, head_sha)
+            cached_context = self._load_cached_context(context_key)
+            if cached_context is not None:
+                cached_context['metadata'] = repo_info
+                cached_context['analysis_timestamp'] = datetime.now().isoformat()
+                logger.info(f"Reusing repository context cached for commit {head_sha}")
+                return cached_context
+            
+            # Step 2: Fetch complete file tree, filtering out excluded files and directories
+            logger.info("Fetching complete file tree...")
+            tree_entries = self._fetch_complete_file_tree(owner, repo, headers, head_sha)
+            if tree_entries is None:
+                raise GitHubAPIError("Failed to fetch repository file tree")
+            
+            filtered_files = list(tree_entries.paths)
+            
+            # Steps 3-5 feed {FILE_CONTENTS} and {STRUCTURE_ANALYSIS}; a custom
+            # template that references neither does not pay for them
+            file_contents: Dict[str, str] = {}
+            if self._prompt_uses('FILE_CONTENTS'):
+                # Step 3: AI-driven file selection for detailed analysis
+                logger.info("Using AI to select important files for analysis...")
+                important_files = self._ai_select_files_to_analyze(filtered_files, repo_info)
+                
+                # Step 4: Fetch content of selected files
+                logger.info(f"Fetching content for {len(important_files)} selected files...")
+                file_contents = self._fetch_file_contents(
+                    owner, repo, important_files, tree_entries, headers,
+                    ref=head_sha, repo_size_kb=repo_info.get('size', 0)
+                )
+            else:
+                logger.info("Custom prompt template does not use {FILE_CONTENTS}; skipping file fetch")
+            
+            structure_analysis: Dict[str, Any] = {}
+            if self._prompt_uses('STRUCTURE_ANALYSIS'):
+                # Step 5: AI-driven structure analysis
+                logger.info("Performing AI-driven structure analysis...")
+                structure_analysis = self._ai_analyze_repo_structure(filtered_files, repo_info)
+            else:
+                logger.info("Custom prompt template does not use {STRUCTURE_ANALYSIS}; skipping structure analysis")
+
+            # Compile comprehensive context
+            context = {
+                'owner': owner,
+                'repo': repo,
+                'metadata': repo_info,
+                'all_files': filtered_files,
+                'structure': structure_analysis,
+                'file_contents': file_contents,
+                'total_files': len(filtered_files),
+                'analyzed_files': len(file_contents),
+                'analysis_timestamp': datetime.now().isoformat(),
+                'analyzer_version': Constants.APP_VERSION
+            }
+            
+            logger.info(
+                f"Repository context successfully compiled: "
+                f"{context['total_files']} total files, "
+                f"{context['analyzed_files']} analyzed in detail"
+            )
+            
+            # Only a context built without fallbacks or failed downloads is reused
+            if context_key and self._degraded_steps:
+                logger.info(
+                    f"Not caching repository context: incomplete "
+                    f"{', '.join(sorted(set(self._degraded_steps)))}"
+                )
+            elif context_key:
+                self.cache.set(context_key, _json_dumps_bytes(context))
+            if self.cache:
+                self.cache.trim()
+            
+            return context
+
+        except Exception as e:
+            error_msg = f"Error fetching repository context: {e}"
+            logger.error(error_msg)
+            return {
+                'error': error_msg,
+                'error_type': type(e).__name__,
+                'repo_url': repo_url,
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _context_cache_key(self, owner: str, repo: str, head_sha: Optional[str]) -> Optional[str]:
+        """
+        Build the disk cache key for a compiled repository context.
+
+        Args:
+            owner (str): Repository owner
+            repo (str): Repository name
+            head_sha (str, optional): Resolved commit SHA of the default branch
+
+        Returns:
+            Optional[str]: Cache key, or None if caching is disabled or the
+            commit is unknown
+
+        Note:
+            The commit pins the tree and file contents; the model, configuration,
+            analyzer version and whether AI is used are folded into the key
+            because they decide which files are selected and how the structure
+            is analyzed.
+        """
+        if not self.cache or not head_sha:
+            return None
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.model, Constants.APP_VERSION, repr(sorted(self.config.items())),
+                     'ai' if self.use_ai else 'heuristic'):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return f"{owner}_{repo}/{head_sha}/context-{digest.hexdigest()}.json"
+
+    def _load_cached_context(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Load a compiled repository context stored by get_full_repository_context.
+
+        Args:
+            key (str, optional): Key from _context_cache_key()
+
+        Returns:
+            Optional[Dict[str, Any]]: The context, or None on a miss or if the
+            entry is unreadable or incomplete
+        """
+        if not key:
+            return None
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        try:
+            context = _json_loads(data)
+        except ValueError:
+            context = None
+        required_keys = ('owner', 'repo', 'all_files', 'structure', 'file_contents', 'total_files', 'analyzed_files')
+        if not isinstance(context, dict) or any(k not in context for k in required_keys):
+            logger.debug(f"Ignoring unusable repository context cache entry {key}")
+            return None
+        return context
+
+    def _get_github_headers(self) -> Dict[str, str]:
+        """
+        Get headers for GitHub API requests including authentication if available.
+        
+        Returns:
+            Dict[str, str]: HTTP headers for GitHub API requests
+        """
+        headers = {
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': f'{Constants.APP_NAME}/{Constants.APP_VERSION}'
+        }
+        
+        if self.github_token:
+            headers['Authorization'] = f'token {self.github_token}'
+            
+        return headers
+
+    def _create_github_session(self) -> requests.Session:
+        """
+        Create the shared HTTP session used for all GitHub API calls.
+
+        Returns:
+            requests.Session: Session with default GitHub headers, a connection
+            pool sized for concurrent fetches, and transport-level retries
+
+        Note:
+            Reusing one session keeps connections alive between requests, so
+            TCP and TLS handshakes are paid once rather than per file. Each host
+            pool holds exactly one connection per fetch worker and blocks when
+            all are busy, rather than opening overflow connections that are
+            discarded after a single request.
+        """
+        # The HTTP stack is imported on demand, like the config parsers, so that
+        # --help and argument errors exit without loading it
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        session = requests.Session()
+        session.headers.update(self._get_github_headers())
+        adapter = HTTPAdapter(
+            pool_connections=Constants.GITHUB_HTTP_HOST_POOLS,
+            pool_maxsize=Constants.GITHUB_MAX_CONCURRENT_REQUESTS,
+            pool_block=True,
+            max_retries=Retry(
+                total=Constants.GITHUB_HTTP_RETRIES,
+                backoff_factor=1,
+                # Rate limits (403/429) are left to GitHubRateLimiter, which caps the
+                # wait at GITHUB_MAX_RATE_LIMIT_WAIT; sleeping out Retry-After here
+                # would bypass that cap and spend quota on each retry
+                status_forcelist=[502, 503, 504],
+                respect_retry_after_header=True,
+                raise_on_status=False  # Hand the final response to the caller's rate-limit handling
+            )
+        )
+        session.mount('https://', adapter)
+        return session
+
+    def _github_get(self, url: str, headers: Dict[str, str], stream: bool = False) -> requests.Response:
+        """
+        Issue a GitHub API GET request paced by the shared rate limiter.
+
+        Args:
+            url (str): Full API URL
+            headers (Dict[str, str]): HTTP headers for authentication
+            stream (bool): Defer downloading the body (the caller must close the response)
+
+        Returns:
+            requests.Response: The raw response; status handling is left to the caller
+        """
+        self.rate_limiter.wait()
+        response = self._http.get(url, headers=headers, timeout=Constants.GITHUB_API_TIMEOUT, stream=stream)
+        self.rate_limiter.update(response)
+        return response
+
+    def _github_post(self, url: str, payload: Dict[str, Any], headers: Dict[str, str]) -> requests.Response:
+        """
+        Issue a GitHub API POST request with a JSON body, paced by the shared rate limiter.
+
+        Args:
+            url (str): Full API URL
+            payload (Dict[str, Any]): JSON request body
+            headers (Dict[str, str]): HTTP headers for authentication
+
+        Returns:
+            requests.Response: The raw response; status handling is left to the caller
+        """
+        self.rate_limiter.wait()
+        response = self._http.post(url, json=payload, headers=headers, timeout=Constants.GITHUB_API_TIMEOUT)
+        self.rate_limiter.update(response)
+        return response
+
+    def _wait_out_rate_limit(self, response: requests.Response, attempt: int) -> bool:
+        """
+        Sleep through a rate-limited response if another attempt is worthwhile.
+
+        Args:
+            response (requests.Response): The rate-limited response
+            attempt (int): Zero-based number of the attempt that just failed
+
+        Returns:
+            bool: True if the caller should retry, False if it should give up
+            (no attempts left, or the limit resets later than GITHUB_MAX_RATE_LIMIT_WAIT)
+        """
+        delay = self.rate_limiter.retry_delay(attempt, response)
+        if attempt + 1 >= Constants.GITHUB_RETRY_ATTEMPTS or delay > Constants.GITHUB_MAX_RATE_LIMIT_WAIT:
+            logger.warning(f"GitHub rate limit exceeded. Resets in {int(delay)}s")
+            return False
+
+        logger.warning(f"GitHub rate limit hit, retrying in {delay:.1f}s")
+        time.sleep(delay)
+        return True
+
+    def _github_get_revalidated(self, url: str, headers: Dict[str, str],
+                                cache_prefix: str) -> Tuple[requests.Response, bytes]:
+        """
+        Issue a conditional GitHub GET, reusing the cached body when it is unchanged.
+
+        Args:
+            url (str): Full API URL
+            headers (Dict[str, str]): HTTP headers for authentication
+            cache_prefix (str): Cache namespace for the repository ("<owner>_<repo>")
+
+        Returns:
+            Tuple[requests.Response, bytes]: The response as received, and the
+            resource body: the cached body for a 304, otherwise the response
+            content. A 304 passes raise_for_status(), so callers check the
+            response as usual and then read the returned body.
+
+        Note:
+            The ETag of the last 200 response is sent as If-None-Match. GitHub
+            answers unchanged resources with an empty 304, which does not count
+            against the primary rate limit for authenticated requests.
+        """
+        if not self.cache:
+            response = self._github_get(url, headers)
+            return response, response.content
+
+        digest = hashlib.sha256(f"{headers.get('Accept', '')} {url}".encode('utf-8')).hexdigest()[:32]
+        cache_key = f"{cache_prefix}/etags/{digest}"
+        cached = self.cache.get(cache_key)
+        etag, _, cached_body = cached.partition(b'\n') if cached else (b'', b'', b'')
+
+        request_headers = {**headers, 'If-None-Match': etag.decode('ascii')} if etag else headers
+        response = self._github_get(url, request_headers)
+
+        if response.status_code == 304 and etag:
+            logger.debug(f"Not modified, using cached response for {url}")
+            return response, cached_body
+        if response.status_code == 200 and response.headers.get('ETag'):
+            self.cache.set(cache_key, response.headers['ETag'].encode('ascii') + b'\n' + response.content)
+        return response, response.content
+
+    def _is_relevant_file(self, file_path: str) -> bool:
+        """
+        Check whether a file passes the directory and file type filters.
+        
+        Args:
+            file_path (str): File path relative to the repository root
+            
+        Returns:
+            bool: True if the file should be kept
+            
+        Note:
+            Keeps files with a supported extension or no extension at all,
+            outside excluded directories and without an excluded suffix.
+            The path is split once and checked against a frozenset of excluded
+            directory names; excluded suffixes are matched by a single
+            str.endswith call over a tuple. The extension is taken from the last
+            path component with string operations rather than a Path object.
+        """
+        parts = file_path.split('/')
+        if not self._excluded_dirs.isdisjoint(parts) or file_path.endswith(self._excluded_suffixes):
+            return False
+        
+        # Same rule as PurePath.suffix: dotfiles and trailing dots have no extension
+        name = parts[-1]
+        dot = name.rfind('.')
+        suffix = name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+        return suffix in self._allowed_suffixes
+
+    def _fetch_repo_info(self, owner: str, repo: str, headers: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Fetch repository metadata from GitHub API with error handling and rate limiting.
+
+        Args:
+            owner (str): Repository owner username
+            repo (str): Repository name
+            headers (Dict[str, str]): HTTP headers for authentication
+            
+        Returns:
+            Dict[str, Any]: Repository metadata or empty dict on failure
+            
+        Raises:
+            GitHubAPIError: If API request fails after retries
+
+        Note:
+            Revalidated with the cached ETag, so an unchanged repository costs
+            an empty 304 instead of a full metadata download.
+        """
+        import requests  # Imported on demand, see _create_github_session
+        
+        url = f"{Constants.GITHUB_API_BASE}/{owner}/{repo}"
+        
+        for attempt in range(Constants.GITHUB_RETRY_ATTEMPTS):
+            try:
+                logger.debug(f"Fetching repository info (attempt {attempt + 1}): {url}")
+                
+                response, body = self._github_get_revalidated(url, headers, f"{owner}_{repo}")
+                
+                # Handle rate limiting: wait for the advertised reset if it is close
+                if self.rate_limiter.is_rate_limited(response):
+                    if self._wait_out_rate_limit(response, attempt):
+                        continue
+                    raise GitHubAPIError("GitHub API rate limit exceeded")
+                
+                response.raise_for_status()
+                repo_data = _json_loads(body)
+                
+                # Log rate limit status
+                remaining = response.headers.get('X-RateLimit-Remaining')
+                if remaining:
+                    logger.debug(f"GitHub API requests remaining: {remaining}")
+                
+                return repo_data
+                
+            except requests.exceptions.Timeout:
+                logger.warning(f"GitHub API timeout (attempt {attempt + 1})")
+                if attempt + 1 < Constants.GITHUB_RETRY_ATTEMPTS:
+                    time.sleep(self.rate_limiter.retry_delay(attempt))  # Jittered exponential backoff
+                continue
+                
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f"GitHub API request failed (attempt {attempt + 1}): {e}")
+                if attempt + 1 < Constants.GITHUB_RETRY_ATTEMPTS:
+                    time.sleep(self.rate_limiter.retry_delay(attempt))
+                    continue
+                raise GitHubAPIError(f"Failed to fetch repository info: {e}")
+        
+        return {}
+
+    def _fetch_head_sha(self, owner: str, repo: str, branch: Optional[str], headers: Dict[str, str]) -> Optional[str]:
+        """
+        Resolve the commit SHA at the head of a branch.
+
+        Args:
+            owner (str): Repository owner username
+            repo (str): Repository name
+            branch (str, optional): Branch name; the default branch is used if None
+            headers (Dict[str, str]): HTTP headers for authentication
+
+        Returns:
+            Optional[str]: 40-character commit SHA, or None if it cannot be resolved
+
+        Note:
+            Requests the 'application/vnd.github.sha' media type so the
+            response body is just the SHA rather than the full commit.
+        """
+        import requests  # Imported on demand, see _create_github_session
+        
+        url = f"{Constants.GITHUB_API_BASE}/{owner}/{repo}{Constants.GITHUB_COMMITS_ENDPOINT}/{branch or 'HEAD'}"
+        try:
+            response, body = self._github_get_revalidated(
+                url, {**headers, 'Accept': 'application/vnd.github.sha'}, f"{owner}_{repo}"
+            )
+            response.raise_for_status()
+            head_sha = body.decode('ascii', errors='replace').strip()
+            if re.fullmatch(r'[0-9a-f]{40}', head_sha):
+                logger.debug(f"Resolved {branch or 'HEAD'} to {head_sha}")
+                return head_sha
+            logger.warning(f"Unexpected head commit response for {owner}/{repo}")
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not resolve head commit for {owner}/{repo}: {e}")
+        return None
+
+    def _fetch_complete_file_tree(self, owner: str, repo: str, headers: Dict[str, str],
+                                  head_sha: Optional[str] = None) -> Optional[TreeEntries]:
+        """
+        Fetch complete file tree recursively from GitHub API with error handling.
+
+        Args:
+            owner (str): Repository owner username
+            repo (str): Repository name  
+            headers (Dict[str, str]): HTTP headers for authentication
+            head_sha (str, optional): Commit to list; HEAD if not given. When set,
+                the tree is served from and stored in the on-disk cache
+            
+        Returns:
+            Optional[TreeEntries]: Path, SHA and size of the blobs that pass
+            _is_relevant_file (possibly none), or None if the tree could not be
+            fetched
+            
+        Note:
+            Uses GitHub's recursive tree API which is more efficient than
+            making multiple API calls for directory traversal. The blob SHAs
+            let file contents be fetched without re-resolving each path.
+            Each blob is filtered as the response is walked, so excluded files
+            never get an entry and only relevant entries outlive the response.
+        """
+        import requests  # Imported on demand, see _create_github_session
+        
+        cache_key = (
+            f"{owner}_{repo}/{head_sha}/tree-{self._filter_fingerprint}.json"
+            if head_sha and self.cache else None
+        )
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                try:
+                    entries = TreeEntries.from_json(cached)
+                    logger.info(f"Loaded {len(entries)} files from cached tree at {head_sha[:12]}")
+                    return entries
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Ignoring corrupt cached tree for {owner}/{repo}")
+        
+        tree_ref = head_sha or 'HEAD'
+        url = f"{Constants.GITHUB_API_BASE}/{owner}/{repo}{Constants.GITHUB_TREE_ENDPOINT.format(ref=tree_ref)}"
+        
+        for attempt in range(Constants.GITHUB_RETRY_ATTEMPTS):
+            try:
+                logger.debug(f"Fetching file tree (attempt {attempt + 1}): {url}")
+                
+                response = self._github_get(url, headers)
+                
+                # Handle rate limiting: wait for the advertised reset if it is close
+                if self.rate_limiter.is_rate_limited(response):
+                    if self._wait_out_rate_limit(response, attempt):
+                        continue
+                    raise GitHubAPIError("GitHub API rate limit exceeded")
+                
+                response.raise_for_status()
+                tree_data = _json_loads(response.content)
+                truncated = tree_data.get('truncated', False)
+                
+                # Keep relevant blob entries (not trees/directories) straight from the response
+                entries = TreeEntries()
+                blob_count = 0
+                is_relevant = self._is_relevant_file
+                for item in tree_data.get('tree', []):
+                    if item['type'] != 'blob':
+                        continue
+                    blob_count += 1
+                    if is_relevant(item['path']):
+                        entries.append(item['path'], item['sha'], item.get('size', 0))
+                del tree_data, response
+                
+                logger.info(f"Retrieved {blob_count} files from repository tree, {len(entries)} relevant after filtering")
+                if cache_key and not truncated:
+                    self.cache.set(cache_key, entries.to_json().encode('utf-8'))
+                return entries
+                
+            except requests.exceptions.Timeout:
+                logger.warning(f"File tree fetch timeout (attempt {attempt + 1})")
+                if attempt + 1 < Constants.GITHUB_RETRY_ATTEMPTS:
+                    time.sleep(self.rate_limiter.retry_delay(attempt))
+                continue
+                
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f"Failed to fetch file tree (attempt {attempt + 1}): {e}")
+                if attempt + 1 < Constants.GITHUB_RETRY_ATTEMPTS:
+                    time.sleep(self.rate_limiter.retry_delay(attempt))
+                    continue
+                raise GitHubAPIError(f"Failed to fetch file tree: {e}")
+        
+        return None
+
+    def _ai_select_files_to_analyze(self, all_files: List[str], repo_info: Dict[str, Any]) -> List[str]:
+        """
+        Use AI to intelligently select the most important files for detailed analysis.
+        
+        Falls back to heuristic selection if AI call fails.
+
+        Args:
+            all_files (List[str]): Complete list of file paths in repository
+            repo_info (Dict[str, Any]): Repository metadata from GitHub API
+            
+        Returns:
+            List[str]: List of selected file paths for detailed analysis
+            
+        Note:
+            AI selection considers:
+            - Build and configuration files
+            - CI/CD workflows  
+            - Key source files indicating architecture
+            - Monorepo detection and handling
+            - Multi-language project support
+
+            When every file already fits within max_files_to_analyze the model
+            is not consulted; all files are returned, priority files first.
+        """
+        # Nothing to choose between: skip the model round-trip
+        if len(all_files) <= self.config['max_files_to_analyze']:
+            logger.info(f"All {len(all_files)} files fit the analysis budget, skipping AI file selection")
+            return self._order_by_priority(all_files)
+        
+        if self.client is None:
+            logger.info("AI disabled, using heuristic file selection")
+            return self._heuristic_file_selection(all_files)
+        
+        # Show the AI likely candidates only, and limit them to prevent prompt overflow
+        files_list, shown_files = _format_file_list(self._preselect_candidates(all_files))
+        
+        # Prepare additional context
+        topics = repo_info.get('topics', [])
+        topics_str = ", ".join(topics) if topics else "None specified"
+        
+        selection_prompt = _SELECTION_PROMPT_TEMPLATE.format_map({
+            'name': repo_info.get('name', 'Unknown'),
+            'description': repo_info.get('description', 'No description provided'),
+            'language': repo_info.get('language', 'Not specified'),
+            'topics': topics_str,
+            'size': repo_info.get('size', 0),
+            'stars': repo_info.get('stargazers_count', 0),
+            'forks': repo_info.get('forks_count', 0),
+            'total_files': len(all_files),
+            'shown_files': shown_files,
+            'files_list': files_list,
+            'max_files': self.config['max_files_to_analyze']
+        })
+
+        memo_key = self._ai_memo_key('file_selection', _SELECTION_SYSTEM_PROMPT, selection_prompt)
+        memoized = self._ai_memo_get(memo_key)
+        if isinstance(memoized, list):
+            logger.info(f"Reusing AI file selection of {len(memoized)} files from cache")
+            return memoized
+
+        try:
+            logger.debug("Requesting AI file selection...")
+            ai_response = self._call_ai_model(selection_prompt, cache_namespace='file_selection',
+                                              system_prompt=_SELECTION_SYSTEM_PROMPT, json_opener='[')
+            
+            if isinstance(ai_response, str):
+                # Extract JSON array from response
+                start_idx = ai_response.find('[')
+                end_idx = ai_response.rfind(']') + 1
+                
+                if start_idx != -1 and end_idx > 0:
+                    json_str = ai_response[start_idx:end_idx]
+                    selected_files = _json_loads(json_str)
+                    
+                    # Validate that selected files exist in our file list (set lookup, not a list scan per file)
+                    known_files = frozenset(all_files)
+                    valid_selected = [
+                        f for f in selected_files 
+                        if isinstance(f, str) and f in known_files
+                    ]
+                    
+                    if valid_selected:
+                        logger.info(f"AI selected {len(valid_selected)} files for analysis")
+                        valid_selected = valid_selected[:self.config['max_files_to_analyze']]
+                        self._ai_memo_set(memo_key, valid_selected)
+                        self._store_semantic_response('file_selection', selection_prompt,
+                                                      _SELECTION_SYSTEM_PROMPT, ai_response)
+                        return valid_selected
+                    else:
+                        logger.warning("AI selected no valid files, falling back to heuristic")
+                        
+        except json.JSONDecodeError as e:
+            logger.warning(f"AI file selection returned invalid JSON: {e}")
+        except Exception as e:
+            logger.warning(f"AI file selection failed: {e}")
+
+        # Fallback: Heuristic selection using priority patterns
+        logger.info("Using heuristic file selection as fallback")
+        self._degraded_steps.append('file selection')
+        return self._heuristic_file_selection(all_files)
+
+    def _ai_memo_key(self, namespace: str, system_prompt: str, prompt: str) -> Optional[str]:
+        """
+        Build the disk cache key for a parsed AI discovery result.
+
+        Args:
+            namespace (str): Kind of call, e.g. 'file_selection'
+            system_prompt (str): Fixed instructions sent with the call
+            prompt (str): Rendered per-repository prompt
+
+        Returns:
+            Optional[str]: Cache key, or None if caching is disabled
+
+        Note:
+            The prompts are a pure function of the file list and repository
+            metadata, so hashing them with the model name identifies the
+            result exactly; any change to the inputs or templates misses.
+        """
+        if not self.cache:
+            return None
+        model_name = Constants.MODEL_NAME_MAP.get(self.model, Constants.MODEL_NAME_MAP[Constants.DEFAULT_MODEL])
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (model_name, system_prompt, prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return f"ai/{namespace}/{digest.hexdigest()}.json"
+
+    def _ai_memo_get(self, key: Optional[str]) -> Any:
+        """
+        Load a memoized AI discovery result.
+
+        Args:
+            key (str, optional): Key from _ai_memo_key()
+
+        Returns:
+            Any: The cached result, or None on a miss
+        """
+        if not key:
+            return None
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        try:
+            return _json_loads(cached)
+        except ValueError:
+            logger.debug(f"Ignoring corrupt AI result cache entry {key}")
+            return None
+
+    def _ai_memo_set(self, key: Optional[str], value: Any) -> None:
+        """
+        Store a parsed AI discovery result.
+
+        Args:
+            key (str, optional): Key from _ai_memo_key()
+            value (Any): JSON-serializable result
+        """
+        if key:
+            self.cache.set(key, _json_dumps(value).encode('utf-8'))
+
+    def _preselect_candidates(self, all_files: List[str]) -> List[str]:
+        """
+        Narrow the file list offered to the AI for selection.
+
+        Args:
+            all_files (List[str]): Filtered file paths in tree order
+
+        Returns:
+            List[str]: Files at most one directory deep plus any file matching
+            a PRIORITY_PATTERNS entry, in tree order
+
+        Note:
+            Deeply nested source files rarely describe the build, so leaving
+            them out shrinks the prompt substantially. If the candidates would
+            not even fill the analysis budget, all files are returned instead.
+        """
+        candidates = [
+            file_path for file_path in all_files
+            if file_path.count('/') <= 1 or _PRIORITY_RE.search(file_path.lower())
+        ]
+        if len(candidates) <= self.config['max_files_to_analyze']:
+            return all_files
+        logger.debug(f"Preselected {len(candidates)} of {len(all_files)} files as AI selection candidates")
+        return candidates
+
+    @staticmethod
+    def _order_by_priority(file_paths: List[str]) -> List[str]:
+        """
+        Order files so those matching earlier PRIORITY_PATTERNS come first.
+
+        Args:
+            file_paths (List[str]): File paths to order
+
+        Returns:
+            List[str]: The same paths; files matching no pattern keep their
+            original relative order at the end
+        """
+        return sorted(file_paths, key=_priority_rank)
+
+    def _heuristic_file_selection(self, all_files: List[str]) -> List[str]:
+        """
+        Fallback heuristic method for selecting important files when AI selection fails.
+        
+        Args:
+            all_files (List[str]): Complete list of file paths
+            
+        Returns:
+            List[str]: Heuristically selected file paths
+            
+        Note:
+            Uses priority patterns and scoring to select the most likely
+            important files for repository analysis.
+        """
+        pattern_count = len(Constants.PRIORITY_PATTERNS)
+        scored_files = []
+        
+        for file_path in all_files:
+            score = 0
+            file_name = file_path.rpartition('/')[2].lower()
+            
+            # Score based on priority patterns; higher score for higher priority patterns
+            rank = _priority_rank(file_path)
+            if rank < pattern_count:
+                score += (pattern_count - rank) * 10
+            
+            # Additional scoring factors
+            if file_path.count('/') == 0:  # Root level files
+                score += 5
+            if 'config' in file_name or 'setup' in file_name:
+                score += 3
+            if file_name in ['readme.md', 'license', 'contributing.md']:
+                score += 2
+            
+            if score > 0:
+                scored_files.append((file_path, score))
+        
+        # Take the top files by score (ties keep tree order)
+        top_files = heapq.nlargest(self.config['max_files_to_analyze'], scored_files, key=lambda x: x[1])
+        selected = [f[0] for f in top_files]
+        
+        logger.info(f"Heuristic selection chose {len(selected)} files")
+        return selected
+
+    def _fetch_file_contents(self, owner: str, repo: str, file_paths: List[str],
+                             tree_entries: TreeEntries, headers: Dict[str, str],
+                             ref: Optional[str] = None, repo_size_kb: int = 0) -> Dict[str, str]:
+        """
+        Fetch contents of selected files with size limits, encoding handling, and error recovery.
+
+        Args:
+            owner (str): Repository owner username
+            repo (str): Repository name
+            file_paths (List[str]): List of file paths to fetch content for
+            tree_entries (TreeEntries): Repository tree entries (path, sha, size)
+            headers (Dict[str, str]): HTTP headers for authentication
+            ref (str, optional): Commit the tree was listed at, for archive downloads
+            repo_size_kb (int): Repository size reported by GitHub, in KB
+            
+        Returns:
+            Dict[str, str]: Dictionary mapping file paths to their text contents
+            
+        Note:
+            - With a GitHub token, uncached blobs that fit the total size budget
+              are first fetched in batches through the GraphQL API; anything it
+              cannot return in full falls back to the REST blob endpoint
+            - Without a token, small repositories with many uncached files are
+              fetched as one tarball instead of one REST request per file
+            - Downloads run concurrently on a bounded thread pool; results are
+              consumed in selection order so the total size cutoff is deterministic,
+              and queued downloads are cancelled once the cutoff or a rate-limit
+              error ends the loop
+            - Blobs are fetched by SHA from the git data API, and blobs larger
+              than MAX_FETCHABLE_FILE_SIZE are skipped without a request
+            - Handles binary files by skipping them
+            - Applies size limits to prevent memory issues
+            - Uses proper error handling to continue on individual file failures
+            - Implements rate limiting awareness
+        """
+        file_contents = {}
+        total_content_size = 0
+        max_total_size = Constants.MAX_TOTAL_CONTENT_SIZE
+
+        if not file_paths:
+            return file_contents
+
+        if self.github_token:
+            # Only prefetch what the total size cutoff below can still take:
+            # walk the selection in order, counting each file at its tree size
+            # capped at max_file_size (text is truncated to that many chars)
+            max_file_size = self.config['max_file_size']
+            budget_paths = []
+            expected_size = 0
+            for file_path in file_paths:
+                if expected_size >= max_total_size:
+                    break
+                budget_paths.append(file_path)
+                entry = tree_entries.get(file_path)
+                if entry is not None:
+                    expected_size += min(entry.get('size', 0), max_file_size)
+            prefetched = self._fetch_blobs_graphql(owner, repo, budget_paths, tree_entries, headers)
+        elif ref and 0 < repo_size_kb <= Constants.TARBALL_MAX_REPO_SIZE_KB:
+            prefetched = self._fetch_blobs_tarball(owner, repo, file_paths, tree_entries, ref, headers)
+        else:
+            prefetched = {}
+
+        def fetch(file_path: str) -> Optional[str]:
+            if file_path in prefetched:
+                return prefetched[file_path]
+            return self._fetch_single_file(owner, repo, file_path, tree_entries.get(file_path), headers)
+
+        max_workers = min(Constants.GITHUB_MAX_CONCURRENT_REQUESTS, len(file_paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch, file_path) for file_path in file_paths]
+
+            try:
+                for i, (file_path, future) in enumerate(zip(file_paths, futures)):
+                    # Check if we've exceeded total content size limit
+                    if total_content_size >= max_total_size:
+                        logger.warning(f"Reached maximum total content size ({max_total_size} chars), stopping at {i+1}/{len(file_paths)} files")
+                        break
+
+                    decoded_text = future.result()
+                    if decoded_text is None:
+                        continue
+
+                    file_contents[file_path] = decoded_text
+                    total_content_size += len(decoded_text)
+
+            except GitHubAPIError as e:
+                logger.warning(f"{e} while fetching file contents")
+                self._degraded_steps.append('file fetch')
+
+            # Drop downloads that have not started once the results are no longer needed
+            for future in futures:
+                future.cancel()
+        
+        logger.info(f"Successfully fetched content for {len(file_contents)}/{len(file_paths)} files ({total_content_size} total chars)")
+        return file_contents
+
+    def _fetch_blobs_graphql(self, owner: str, repo: str, file_paths: List[str],
+                             tree_entries: TreeEntries, headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """
+        Fetch many blobs with a few GraphQL queries instead of one REST call each.
+
+        Args:
+            owner (str): Repository owner username
+            repo (str): Repository name
+            file_paths (List[str]): Paths of the files to fetch
+            tree_entries (TreeEntries): Repository tree entries (path, sha, size)
+            headers (Dict[str, str]): HTTP headers for authentication
+
+        Returns:
+            Dict[str, Optional[str]]: Decoded text per path, or None for binary
+            blobs. Paths missing from the result (cached, empty, oversized,
+            truncated by GraphQL, or failed) are left for the REST fetch path.
+
+        Note:
+            Blobs are looked up by SHA with aliased ``object(oid: ...)`` fields,
+            at most GITHUB_GRAPHQL_BATCH_SIZE per query. The blobs are spread over
+            up to GITHUB_MAX_CONCURRENT_REQUESTS queries of at least
+            GITHUB_GRAPHQL_MIN_BATCH_SIZE blobs, which run concurrently over the
+            pooled keep-alive connections. GraphQL requires authentication, so
+            this is only used when a GitHub token is configured.
+        """
+        paths_by_sha: Dict[str, List[str]] = {}
+        for file_path in file_paths:
+            entry = tree_entries.get(file_path)
+            if entry is None or not 0 < entry.get('size', 0) <= Constants.MAX_FETCHABLE_FILE_SIZE:
+                continue
+            if self.cache and self.cache.get(f"{owner}_{repo}/blobs/{entry['sha']}") is not None:
+                continue
+            paths_by_sha.setdefault(entry['sha'], []).append(file_path)
+
+        results: Dict[str, Optional[str]] = {}
+        shas = list(paths_by_sha)
+        if not shas:
+            return results
+
+        workers = Constants.GITHUB_MAX_CONCURRENT_REQUESTS
+        batch_size = min(
+            Constants.GITHUB_GRAPHQL_BATCH_SIZE,
+            max(Constants.GITHUB_GRAPHQL_MIN_BATCH_SIZE, math.ceil(len(shas) / workers))
+        )
+        batches = [shas[start:start + batch_size] for start in range(0, len(shas), batch_size)]
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+            responses = list(executor.map(
+                lambda batch: self._query_blob_batch(owner, repo, batch, headers), batches
+            ))
+
+        for batch, blobs in zip(batches, responses):
+            if blobs is None:
+                continue
+            for i, sha in enumerate(batch):
+                blob = blobs.get(f'b{i}')
+                if not blob or blob.get('isTruncated'):
+                    continue
+                if blob.get('isBinary') or blob.get('text') is None:
+                    # Cache a lone NUL byte in place of the content: it decodes as
+                    # binary, so later runs skip the blob without asking again
+                    if self.cache:
+                        self.cache.set(f"{owner}_{repo}/blobs/{sha}", b'\x00')
+                    for file_path in paths_by_sha[sha]:
+                        logger.debug(f"Skipping binary file: {file_path}")
+                        results[file_path] = None
+                    continue
+
+                blob_bytes = blob['text'].encode('utf-8')
+                if self.cache:
+                    self.cache.set(f"{owner}_{repo}/blobs/{sha}", blob_bytes)
+                for file_path in paths_by_sha[sha]:
+                    results[file_path] = self._decode_file_content(file_path, blob_bytes)
+
+        if results:
+            logger.info(f"Fetched {len(results)} files via GraphQL")
+        return results
+
+    def _query_blob_batch(self, owner: str, repo: str, batch: List[str],
+                          headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Run one GraphQL query for a batch of blobs.
+
+        Args:
+            owner (str): Repository owner username
+            repo (str): Repository name
+            batch (List[str]): Blob SHAs, queried as aliases b0, b1, ...
+            headers (Dict[str, str]): HTTP headers for authentication
+
+        Returns:
+            Optional[Dict[str, Any]]: Blob objects keyed by alias, or None if the
+            query failed
+        """
+        import requests  # Imported on demand, see _create_github_session
+        
+        fields = ' '.join(
+            f'b{i}: object(oid: "{sha}") {{ ... on Blob {{ text isBinary isTruncated }} }}'
+            for i, sha in enumerate(batch)
+        )
+        query = f'query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}'
+
+        try:
+            logger.debug(f"Fetching {len(batch)} blobs via GraphQL")
+            for attempt in range(Constants.GITHUB_RETRY_ATTEMPTS):
+                response = self._github_post(
+                    Constants.GITHUB_GRAPHQL_URL,
+                    {'query': query, 'variables': {'owner': owner, 'name': repo}},
+                    headers
+                )
+                if not self.rate_limiter.is_rate_limited(response):
+                    break
+                if not self._wait_out_rate_limit(response, attempt):
+                    logger.warning("GraphQL blob fetch rate limited, falling back to REST")
+                    return None
+            response.raise_for_status()
+            payload = _json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning(f"GraphQL blob fetch failed, falling back to REST: {e}")
+            return None
+
+        if payload.get('errors'):
+            logger.debug(f"GraphQL blob fetch returned errors: {payload['errors']}")
+        return (payload.get('data') or {}).get('repository') or {}
+
+    def _fetch_single_file(self, owner: str, repo: str, file_path: str,
+                           entry: Optional[Dict[str, Any]], headers: Dict[str, str]) -> Optional[str]:
+        """
+        Fetch and decode a single file via the GitHub git blobs API (raw media type).
+
+        Args:
+            owner (str): Repository owner username
+            repo (str): Repository name
+            file_path (str): Path of the file to fetch
+            entry (Dict[str, Any], optional): Tree entry for the file (path, sha, size)
+            headers (Dict[str, str]): HTTP headers for authentication
+
+        Returns:
+            Optional[str]: Decoded (and possibly truncated) text, or None if the
+            file is missing, binary, or could not be fetched
+
+        Raises:
+            GitHubAPIError: If the GitHub rate limit is hit, so the caller can stop
+        """
+        import requests  # Imported on demand, see _create_github_session
+        
+        if entry is None:
+            logger.debug(f"File not in repository tree: {file_path}")
+            return None
+
+        if entry.get('size', 0) > Constants.MAX_FETCHABLE_FILE_SIZE:
+            logger.debug(f"Skipping oversized file {file_path} ({entry['size']} bytes)")
+            return None
+
+        # The tree already says the file is empty; nothing to download
+        if entry.get('size') == 0:
+            return ''
+
+        cache_key, complete, byte_limit = self._blob_fetch_plan(owner, repo, entry)
+        blob_bytes = self.cache.get(cache_key) if cache_key else None
+        if blob_bytes is None and cache_key and not complete:
+            # A whole blob cached by the GraphQL path serves a prefix request too
+            blob_bytes = self.cache.get(f"{owner}_{repo}/blobs/{entry['sha']}")
+            if blob_bytes is not None:
+                blob_bytes = blob_bytes[:byte_limit]
+        if blob_bytes is not None:
+            logger.debug(f"Loaded cached content for: {file_path}")
+            return self._decode_file_content(file_path, blob_bytes, complete)
+
+        try:
+            url = f"{Constants.GITHUB_API_BASE}/{owner}/{repo}{Constants.GITHUB_BLOBS_ENDPOINT}/{entry['sha']}"
+            raw_headers = {**headers, 'Accept': Constants.GITHUB_RAW_MEDIA_TYPE}
+            logger.debug(f"Fetching content for: {file_path}")
+            
+            # Handle rate limiting gracefully: wait for a close reset, otherwise stop
+            for attempt in range(Constants.GITHUB_RETRY_ATTEMPTS):
+                response = self._github_get(url, raw_headers, stream=True)
+                if not self.rate_limiter.is_rate_limited(response):
+                    break
+                response.close()
+                if not self._wait_out_rate_limit(response, attempt):
+                    raise GitHubAPIError("Hit rate limit")
+            
+            with closing(response):
+                # Skip files that don't exist or are inaccessible
+                if response.status_code == 404:
+                    logger.debug(f"Blob not found: {file_path}")
+                    return None
+                
+                response.raise_for_status()
+                
+                # The raw media type returns the file bytes as the body, with no
+                # JSON or base64 wrapping; partial blobs stop reading at the limit
+                if complete:
+                    blob_bytes = response.content
+                else:
+                    buffer = bytearray()
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        buffer += chunk
+                        if len(buffer) >= byte_limit:
+                            break
+                    blob_bytes = bytes(buffer[:byte_limit])
+                
+        except GitHubAPIError:
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Failed to fetch content for {file_path}: {e}")
+            self._degraded_steps.append('file fetch')
+            return None
+        except Exception as e:
+            logger.warning(f"Unexpected error fetching {file_path}: {e}")
+            self._degraded_steps.append('file fetch')
+            return None
+
+        # Blobs are immutable, so the raw bytes can be cached by SHA indefinitely
+        if cache_key:
+            self.cache.set(cache_key, blob_bytes)
+        return self._decode_file_content(file_path, blob_bytes, complete)
+
+    def _blob_fetch_plan(self, owner: str, repo: str, entry: Dict[str, Any]) -> Tuple[Optional[str], bool, int]:
+        """
+        Work out how much of a blob is needed and where it is cached.
+
+        Args:
+            owner (str): Repository owner username
+            repo (str): Repository name
+            entry (Dict[str, Any]): Tree entry for the file (path, sha, size)
+
+        Returns:
+            Tuple[Optional[str], bool, int]: Cache key (None when caching is off),
+            whether the whole blob is needed, and the byte limit for partial blobs
+
+        Note:
+            Files that will be truncated anyway only need their leading bytes
+            decoded (UTF-8 needs at most 4 bytes per character, plus slack for a
+            split character). Such prefixes are cached under their own key.
+        """
+        byte_limit = self.config['max_file_size'] * 4 + 8
+        complete = entry.get('size', 0) <= byte_limit
+
+        cache_key = None
+        if self.cache:
+            cache_key = f"{owner}_{repo}/blobs/{entry['sha']}"
+            if not complete:
+                cache_key += f".head{byte_limit}"
+        return cache_key, complete, byte_limit
+
+    def _fetch_blobs_tarball(self, owner: str, repo: str, file_paths: List[str],
+                             tree_entries: TreeEntries, ref: str, headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """
+        Fetch many files from a single streamed tarball of the repository.
+
+        Args:
+            owner (str): Repository owner username
+            repo (str): Repository name
+            file_paths (List[str]): Paths of the files to fetch
+            tree_entries (TreeEntries): Repository tree entries (path, sha, size)
+            ref (str): Commit to download, matching the tree the paths came from
+            headers (Dict[str, str]): HTTP headers for authentication
+
+        Returns:
+            Dict[str, Optional[str]]: Decoded text per path, or None for binary
+            files. Paths missing from the result (cached, empty, oversized, not in
+            the archive, or after a failure) are left for the REST fetch path.
+
+        Note:
+            Only used when at least TARBALL_MIN_FILES files are uncached, since
+            the archive costs one request but transfers the whole repository.
+            The archive is decompressed as it streams in and the download stops
+            as soon as every wanted file has been read.
+        """
+        import requests  # Imported on demand, see _create_github_session
+        
+        wanted: Dict[str, Tuple[Dict[str, Any], Optional[str], bool, int]] = {}
+        for file_path in file_paths:
+            entry = tree_entries.get(file_path)
+            if entry is None or not 0 < entry.get('size', 0) <= Constants.MAX_FETCHABLE_FILE_SIZE:
+                continue
+            cache_key, complete, byte_limit = self._blob_fetch_plan(owner, repo, entry)
+            if cache_key and self.cache.get(cache_key) is not None:
+                continue
+            wanted[file_path] = (entry, cache_key, complete, byte_limit)
+
+        results: Dict[str, Optional[str]] = {}
+        if len(wanted) < Constants.TARBALL_MIN_FILES:
+            return results
+
+        url = f"{Constants.GITHUB_API_BASE}/{owner}/{repo}{Constants.GITHUB_TARBALL_ENDPOINT.format(ref=ref)}"
+        try:
+            logger.debug(f"Fetching {len(wanted)} files from repository tarball")
+            with closing(self._github_get(url, headers, stream=True)) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with tarfile.open(fileobj=response.raw, mode='r|gz') as archive:
+                    for member in archive:
+                        # Archive entries are prefixed with a "<owner>-<repo>-<sha>/" directory
+                        file_path = member.name.partition('/')[2]
+                        if not member.isfile() or file_path not in wanted:
+                            continue
+
+                        entry, cache_key, complete, byte_limit = wanted.pop(file_path)
+                        reader = archive.extractfile(member)
+                        blob_bytes = reader.read() if complete else reader.read(byte_limit)
+                        if cache_key:
+                            self.cache.set(cache_key, blob_bytes)
+                        results[file_path] = self._decode_file_content(file_path, blob_bytes, complete)
+
+                        if not wanted:
+                            break
+        except (requests.exceptions.RequestException, tarfile.TarError, OSError, EOFError) as e:
+            logger.warning(f"Tarball fetch failed, falling back to per-file requests: {e}")
+
+        if results:
+            logger.info(f"Fetched {len(results)} files from repository tarball")
+        return results
+
+    def _decode_file_content(self, file_path: str, blob_bytes: bytes, complete: bool = True) -> Optional[str]:
+        """
+        Decode raw file bytes to text, skipping binary files and applying the size limit.
+
+        Args:
+            file_path (str): Path of the file, for logging
+            blob_bytes (bytes): Raw file contents, or only their leading bytes
+            complete (bool): False if blob_bytes is a prefix of a larger file
+
+        Returns:
+            Optional[str]: Decoded (and possibly truncated) text, or None for binary files
+
+        Note:
+            A NUL byte near the start marks a file as binary (the same check git
+            uses), so such files are rejected without decoding the whole blob.
+        """
+        if blob_bytes.find(b'\x00', 0, Constants.BINARY_SNIFF_BYTES) != -1:
+            logger.debug(f"Skipping binary file: {file_path}")
+            return None
+        
+        # Try to decode as UTF-8, skip binary files; a prefix may end mid-character
+        try:
+            decoded_text = codecs.getincrementaldecoder('utf-8')().decode(blob_bytes, final=complete)
+        except UnicodeDecodeError:
+            logger.debug(f"Skipping binary file: {file_path}")
+            return None
+        
+        # Apply size limit per file
+        max_size = self.config['max_file_size']
+        if len(decoded_text) > max_size or not complete:
+            logger.debug(f"Truncating large file {file_path} from {len(decoded_text)} to {max_size} chars")
+            decoded_text = decoded_text[:max_size] + "\n... (truncated)"
+        
+        return decoded_text
+
+    def _ai_analyze_repo_structure(self, all_files: List[str], repo_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Use AI to analyze repository structure, detecting patterns like monorepos, 
+        multi-language setups, and architectural decisions.
+        
+        Falls back to basic analysis if AI fails.
+
+        Args:
+            all_files (List[str]): Complete list of file paths in repository
+            repo_info (Dict[str, Any]): Repository metadata from GitHub API
+            
+        Returns:
+            Dict[str, Any]: Comprehensive structure analysis dictionary
+            
+        Note:
+            Analysis includes:
+            - Directory structure and organization
+            - Language detection and distribution  
+            - Monorepo vs single-project identification
+            - Testing, documentation, and CI/CD presence
+            - Architectural patterns and frameworks
+        """
+        if self.client is None:
+            logger.info("AI disabled, using heuristic structure analysis")
+            return self._heuristic_structure_analysis(all_files, repo_info)
+        
+        # Prepare file list for analysis (limit to prevent prompt overflow)
+        files_list, shown_files = _format_file_list(all_files)
+        
+        # Prepare additional context
+        topics = repo_info.get('topics', [])
+        topics_str = ", ".join(topics) if topics else "None"
+        
+        structure_prompt = _STRUCTURE_PROMPT_TEMPLATE.format_map({
+            'name': repo_info.get('name', 'Unknown'),
+            'description': repo_info.get('description', 'No description provided'),
+            'language': repo_info.get('language', 'Not specified'),
+            'topics': topics_str,
+            'size': repo_info.get('size', 0),
+            'created_at': repo_info.get('created_at', 'Unknown'),
+            'updated_at': repo_info.get('updated_at', 'Unknown'),
+            'default_branch': repo_info.get('default_branch', 'main'),
+            'shown_files': shown_files,
+            'total_files': len(all_files),
+            'files_list': files_list
+        })
+
+        memo_key = self._ai_memo_key('structure_analysis', _STRUCTURE_SYSTEM_PROMPT, structure_prompt)
+        memoized = self._ai_memo_get(memo_key)
+        if isinstance(memoized, dict):
+            logger.info("Reusing AI structure analysis from cache")
+            return memoized
+
+        try:
+            logger.debug("Requesting AI structure analysis...")
+            ai_response = self._call_ai_model(structure_prompt, cache_namespace='structure_analysis',
+                                              system_prompt=_STRUCTURE_SYSTEM_PROMPT, json_opener='{')
+            
+            if isinstance(ai_response, str):
+                # Extract JSON from response
+                start_idx = ai_response.find('{')
+                end_idx = ai_response.rfind('}') + 1
+                
+                if start_idx != -1 and end_idx > 0:
+                    json_str = ai_response[start_idx:end_idx]
+                    structure_analysis = _json_loads(json_str)
+                    
+                    logger.info("AI structure analysis completed successfully")
+                    self._ai_memo_set(memo_key, structure_analysis)
+                    self._store_semantic_response('structure_analysis', structure_prompt,
+                                                  _STRUCTURE_SYSTEM_PROMPT, ai_response)
+                    return structure_analysis
+                    
+        except json.JSONDecodeError as e:
+            logger.warning(f"AI structure analysis returned invalid JSON: {e}")
+        except Exception as e:
+            logger.warning(f"AI structure analysis failed: {e}")
+
+        # Fallback: Basic heuristic structure analysis
+        logger.info("Using fallback heuristic structure analysis")
+        self._degraded_steps.append('structure analysis')
+        return self._heuristic_structure_analysis(all_files, repo_info)
+
+    def _heuristic_structure_analysis(self, all_files: List[str], repo_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fallback heuristic method for analyzing repository structure when AI fails.
+        
+        Args:
+            all_files (List[str]): Complete list of file paths
+            repo_info (Dict[str, Any]): Repository metadata
+            
+        Returns:
+            Dict[str, Any]: Basic structure analysis
+        """
+        # Extract directory structure
+        directories = set()
+        file_extensions = collections.Counter()
+        has_tests = has_ci_cd = has_docker = has_docs = has_workspace_config = False
+        package_json_count = 0
+        
+        # Single pass over the file list; flags that are already set are not re-tested
+        for file_path in all_files:
+            # Collect ancestor directories from the deepest up; once one is
+            # already known, all of its ancestors are too
+            idx = file_path.rfind('/')
+            while idx != -1:
+                directory = file_path[:idx]
+                if directory in directories:
+                    break
+                directories.add(directory)
+                idx = file_path.rfind('/', 0, idx)
+            
+            # Count file extensions
+            if '.' in file_path:
+                file_extensions[os.path.splitext(file_path)[1].lower()] += 1
+            
+            # Basic feature and monorepo detection
+            lowered = file_path.lower()
+            if not has_tests and ('test' in lowered or 'spec' in lowered):
+                has_tests = True
+            if not has_ci_cd and ('.github/' in file_path or '.gitlab-ci' in file_path or 'jenkinsfile' in lowered):
+                has_ci_cd = True
+            if not has_docker and ('dockerfile' in lowered or 'docker-compose' in lowered):
+                has_docker = True
+            if not has_docs and ('readme' in lowered or 'doc' in lowered):
+                has_docs = True
+            if file_path.endswith('package.json'):
+                package_json_count += 1
+            if not has_workspace_config and ('lerna.json' in file_path or 'nx.json' in file_path):
+                has_workspace_config = True
+        
+        # Basic language detection
+        extension_to_language = {
+            '.js': 'JavaScript', '.ts': 'TypeScript', '.py': 'Python',
+            '.java': 'Java', '.go': 'Go', '.rs': 'Rust', '.cpp': 'C++',
+            '.c': 'C', '.cs': 'C#', '.rb': 'Ruby', '.php': 'PHP',
+            '.swift': 'Swift', '.kt': 'Kotlin', '.scala': 'Scala'
+        }
+        
+        languages_detected = []
+        for ext, count in file_extensions.items():
+            if ext in extension_to_language and count > 0:
+                languages_detected.append(extension_to_language[ext])
+        
+        is_monorepo = package_json_count > 1 or has_workspace_config
+        
+        return {
+            "directories": {
+                "main_directories": sorted(list(directories))[:10],
+                "source_directories": [d for d in directories if any(src in d for src in ['src', 'lib', 'app'])],
+                "config_directories": [d for d in directories if any(cfg in d for cfg in ['config', 'conf', '.github'])],
+                "test_directories": [d for d in directories if any(test in d for test in ['test', 'spec', '__tests__'])],
+                "doc_directories": [d for d in directories if any(doc in d for doc in ['doc', 'docs', 'documentation'])]
+            },
+            "languages": {
+                "primary_language": repo_info.get('language', 'Unknown'),
+                "secondary_languages": languages_detected[:5],
+                "language_distribution": {lang: "estimated" for lang in languages_detected[:3]},
+                "frameworks_detected": []
+            },
+            "project_type": {
+                "architecture": "monorepo" if is_monorepo else "single-project",
+                "complexity": "moderate",
+                "domain": "unknown",
+                "scale": "unknown"
+            },
+            "features": {
+                "has_tests": has_tests,
+                "has_ci_cd": has_ci_cd,
+                "has_documentation": has_docs,
+                "has_docker": has_docker,
+                "has_database": False,
+                "has_api": False,
+                "has_frontend": any(ext in file_extensions for ext in ['.html', '.css', '.js', '.ts']),
+                "has_backend": any(ext in file_extensions for ext in ['.py', '.java', '.go', '.php'])
+            },
+            "monorepo_analysis": {
+                "is_monorepo": is_monorepo,
+                "workspace_tool": "unknown",
+                "packages": [],
+                "shared_dependencies": False
+            },
+            "build_system": {
+                "build_tools": [],
+                "package_managers": [],
+                "bundlers": [],
+                "task_runners": []
+            },
+            "deployment": {
+                "deployment_targets": [],
+                "containerization": "docker" if has_docker else "none",
+                "infrastructure_as_code": "none"
+            },
+            "quality_assurance": {
+                "linting": [],
+                "formatting": [],
+                "testing_frameworks": [],
+                "code_coverage": False
+            },
+            "insights": {
+                "architectural_patterns": [],
+                "notable_conventions": [],
+                "potential_improvements": [],
+                "estimated_team_size": "unknown",
+                "maintenance_level": "unknown",
+                "fallback_analysis": True
+            }
+        }
+
+    def _format_file_contents(self, file_contents: Dict[str, str]) -> str:
+        """
+        Format file contents for inclusion in AI prompts with clear delimiters and structure.
+
+        Args:
+            file_contents (Dict[str, str]): Dictionary mapping file paths to contents
+            
+        Returns:
+            str: Formatted string with clear file boundaries and metadata
+            
+        Note:
+            Uses consistent formatting to help AI models parse file contents:
+            - Clear start/end delimiters
+            - File path headers
+            - Content preservation with proper encoding
+        """
+        buffer = io.StringIO()
+        self._write_file_contents(buffer, file_contents)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _write_file_contents(buffer: io.StringIO, file_contents: Dict[str, str]) -> None:
+        """
+        Write the formatted file contents (see _format_file_contents) into a buffer.
+
+        Args:
+            buffer (io.StringIO): Buffer to append to
+            file_contents (Dict[str, str]): Dictionary mapping file paths to contents
+        """
+        if not file_contents:
+            buffer.write("No file contents available for analysis.")
+            return
+        
+        # Written straight into one buffer instead of building a string per file
+        for i, (file_path, content) in enumerate(file_contents.items()):
+            if i:
+                buffer.write('\n')
+            
+            # File header with metadata
+            file_ext = os.path.splitext(file_path)[1]
+            buffer.write(f"\n{_FILE_SEPARATOR}\nFILE: {file_path}\nSIZE: {len(content)} characters\n"
+                         f"TYPE: {file_ext or 'no extension'}\n{_FILE_SEPARATOR}\n")
+            buffer.write(content.strip())
+            buffer.write(f"\n\n{_FILE_SEPARATOR}\nEND FILE: {file_path}\n{_FILE_SEPARATOR}\n")
+
+    def analyze_with_ai(self, repo_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Perform comprehensive AI analysis of the repository using custom or default prompts.
+
+        This is the main analysis method that takes the repository context and generates
+        detailed insights including build commands, development workflows, and architectural
+        recommendations.
+
+        Args:
+            repo_data (Dict[str, Any]): Repository context from get_full_repository_context()
+                Must contain: owner, repo, metadata, all_files, structure, file_contents
+                
+        Returns:
+            Dict[str, Any]: Comprehensive analysis dictionary containing:
+                - repository_analysis: Project type, technologies, architecture
+                - build_ecosystem: Build tools, package managers, bundlers
+                - commands: Detailed commands for all development scenarios  
+                - environment: Required versions and dependencies
+                - notes: Additional insights and recommendations
+                - recommended_workflow: Step-by-step development process
+                - error: Error message if analysis failed
+                
+        Note:
+            Falls back gracefully if AI analysis fails, returning error information
+            for debugging and user feedback.
+        """
+        # Validate input data
+        if 'error' in repo_data:
+            logger.error(f"Repository data contains error: {repo_data['error']}")
+            return repo_data
+        
+        if self.client is None:
+            logger.error("AI analysis requested from an analyzer created with use_ai=False")
+            return {'error': 'AI is disabled for this analyzer'}
+
+        required_keys = ['owner', 'repo', 'metadata', 'file_contents', 'structure']
+        missing_keys = [key for key in required_keys if key not in repo_data]
+        if missing_keys:
+            error_msg = f"Missing required repository data keys: {missing_keys}"
+            logger.error(error_msg)
+            return {'error': error_msg}
+
+        # Without any file contents the model has nothing to ground build
+        # commands in, so skip the round-trip (unless the prompt never uses them)
+        if not repo_data['file_contents'] and self._prompt_uses('FILE_CONTENTS'):
+            error_msg = "No files available for analysis"
+            logger.error(f"{error_msg}; skipping AI analysis for {repo_data['owner']}/{repo_data['repo']}")
+            return {'error': error_msg}
+
+        try:
+            # Choose between custom and default prompt
+            if self.config.get('custom_prompt_template'):
+                logger.info("Using custom prompt template for analysis")
+                prompt = self._build_custom_prompt(repo_data)
+                system_prompt = None
+            else:
+                logger.info("Using default comprehensive prompt for analysis")
+                prompt = self._build_default_comprehensive_prompt(repo_data)
+                system_prompt = _ANALYSIS_SYSTEM_PROMPT
+            
+            logger.info(f"Starting AI analysis for {repo_data['owner']}/{repo_data['repo']}")
+            
+            # Call AI model with comprehensive prompt
+            ai_response = self._call_ai_model(prompt, system_prompt=system_prompt, json_opener='{')
+            
+            if isinstance(ai_response, str):
+                try:
+                    # Extract JSON from AI response
+                    start_idx = ai_response.find('{')
+                    end_idx = ai_response.rfind('}') + 1
+                    
+                    if start_idx != -1 and end_idx > 0:
+                        json_str = ai_response[start_idx:end_idx]
+                        analysis_result = _json_loads(json_str)
+                        
+                        # Add metadata to the analysis
+                        analysis_result['analysis_metadata'] = {
+                            'analyzer_version': Constants.APP_VERSION,
+                            'model_used': self.model,
+                            'analysis_timestamp': datetime.now().isoformat(),
+                            'repository': f"{repo_data['owner']}/{repo_data['repo']}",
+                            'files_analyzed': len(repo_data['file_contents']),
+                            'total_files': repo_data.get('total_files', 0)
+                        }
+                        
+                        logger.info("AI analysis completed successfully")
+                        self._persist_ai_response(prompt, system_prompt, ai_response)
+                        return analysis_result
+                        
+                    else:
+                        raise ValueError("No valid JSON found in AI response")
+                        
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse AI response as JSON: {e}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"AI response (first 500 chars): {ai_response[:500]}")
+                    preview = ai_response[:200]
+                    return {
+                        'error': 'AI returned invalid JSON format',
+                        'error_details': str(e),
+                        'raw_response_preview': preview + '...' if len(ai_response) > 200 else preview
+                    }
+            else:
+                logger.error(f"Unexpected AI response type: {type(ai_response)}")
+                return {'error': 'Unexpected AI response format', 'response_type': str(type(ai_response))}
+
+        except Exception as e:
+            error_msg = f"AI analysis failed: {e}"
+            logger.error(error_msg)
+            return {
+                'error': error_msg,
+                'error_type': type(e).__name__,
+                'repository': f"{repo_data.get('owner', 'unknown')}/{repo_data.get('repo', 'unknown')}"
+            }
 
-PHP PROJECTS:
-- Check composer.json require php version
-- Look for .php-version files
-- Check Dockerfile FROM php:XX
+    def _build_custom_prompt(self, repo_data: Dict[str, Any]) -> str:
+        """
+        Build a custom analysis prompt from user-provided template with variable substitution.
 
-RUBY PROJECTS:
-- Examine Gemfile ruby statement
-- Check .ruby-version, .rvmrc files
-- Look for Dockerfile FROM ruby:XX
+        Args:
+            repo_data (Dict[str, Any]): Repository context data
+            
+        Returns:
+            str: Formatted custom prompt with all variables substituted
+            
+        Note:
+            Supported template variables:
+            - {REPO_NAME}: owner/repo format
+            - {DESCRIPTION}: Repository description
+            - {LANGUAGE}: Primary programming language
+            - {TOPICS}: Comma-separated topic tags
+            - {TOTAL_FILES}: Total file count
+            - {FILE_STRUCTURE}: Formatted file list
+            - {FILE_CONTENTS}: Formatted file contents
+            - {STRUCTURE_ANALYSIS}: JSON structure analysis
+            - {COMMAND_CATEGORIES}: Available command categories
+        """
+        template = self.config['custom_prompt_template']
+        
+        # Replacement values, computed only for placeholders the template uses
+        producers = {
+            'REPO_NAME': lambda: f"{repo_data['owner']}/{repo_data['repo']}",
+            'DESCRIPTION': lambda: repo_data['metadata'].get('description', 'No description provided'),
+            'LANGUAGE': lambda: repo_data['metadata'].get('language', 'Not specified'),
+            'TOPICS': lambda: ', '.join(repo_data['metadata'].get('topics', [])) or 'None specified',
+            'TOTAL_FILES': lambda: repo_data.get('total_files', len(repo_data.get('all_files', []))),
+            'FILE_STRUCTURE': lambda: _format_file_list(repo_data.get('all_files', []))[0],
+            'FILE_CONTENTS': lambda: self._format_file_contents(repo_data.get('file_contents', {})),
+            'STRUCTURE_ANALYSIS': lambda: _json_dumps(repo_data.get('structure', {}), indent=True),
+            'COMMAND_CATEGORIES': lambda: self._command_categories_text
+        }
+        values: Dict[str, str] = {}
+        
+        # The template is parsed once per process; inserted text is never rescanned
+        parts = list(_split_prompt_template(template))
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            if name not in values:
+                values[name] = str(producers[name]())
+            parts[i] = values[name]
+        formatted_prompt = ''.join(parts)
+        
+        logger.debug(f"Built custom prompt with {len(values)} variable substitutions")
+        return formatted_prompt
 
-BUILD WRAPPER & TOOL DETECTION:
-- Maven: mvnw vs system mvn, wrapper generation capability
-- Gradle: gradlew vs system gradle
-- Node.js: npm vs yarn vs pnpm (check lock files)
-- Python: pip vs poetry vs pipenv (check pyproject.toml, Pipfile)
-- .NET: dotnet commands, package restore
-- PHP: composer vs system package managers
-- Ruby: bundler vs gem
-- Go: go mod vs GOPATH mode
-- Rust: cargo commands
+    def _prompt_uses(self, name: str) -> bool:
+        """
+        Check whether the analysis prompt will reference a placeholder.
 
-VERSION CONSTRAINT FILES:
-- .tool-versions (asdf), .envrc (direnv)
-- Docker files with specific base image versions
-- CI files (.github/workflows) with setup-* actions specifying versions
+        Args:
+            name (str): Placeholder name without braces, e.g. 'FILE_CONTENTS'
 
-Base your analysis on the actual files and structure provided, not generic assumptions.
-"""
+        Returns:
+            bool: True for the default prompt (which uses everything) or when
+            the custom template contains {name}
+        """
+        template = self.config.get('custom_prompt_template')
+        if not template:
+            return True
+        return name in _split_prompt_template(template)[1::2]
 
-        return prompt
+    def _build_default_comprehensive_prompt(self, repo_data: Dict[str, Any]) -> str:
+        """
+        Build the default comprehensive analysis prompt with all repository context.
 
-    def _call_ai_model(self, prompt: str) -> Union[str, Dict[str, Any]]:
+        Args:
+            repo_data (Dict[str, Any]): Repository context data
+            
+        Returns:
+            str: Repository-specific part of the comprehensive analysis prompt
+            
+        Note:
+            This prompt is designed to extract maximum value from repository analysis,
+            covering build systems, development workflows, deployment, and best practices.
+            The instructions and output schema are sent separately as
+            _ANALYSIS_SYSTEM_PROMPT so they form a cacheable prefix.
+        """
+        # Format structure for prompt
+        structure_summary = _json_dumps(repo_data.get('structure', {}), indent=True)
+        
+        # Prepare metadata
+        metadata = repo_data.get('metadata', {})
+        topics = metadata.get('topics', [])
+        topics_str = ', '.join(topics) if topics else 'None specified'
+        
+        # Thousands-separated counts, formatted together up front
+        counts = {
+            'stars': metadata.get('stargazers_count', 0),
+            'forks': metadata.get('forks_count', 0),
+            'size': metadata.get('size', 0),
+            'total_files': repo_data.get('total_files', 0),
+            'analyzed_files': len(repo_data.get('file_contents', {}))
+        }
+        fields = {name: f"{value:,}" for name, value in counts.items()}
+        
+        # Only the per-repository fields are substituted; the instructions and
+        # schema are the fixed _ANALYSIS_SYSTEM_PROMPT
+        fields.update({
+            'repository': f"{repo_data['owner']}/{repo_data['repo']}",
+            'description': metadata.get('description', 'No description provided'),
+            'language': metadata.get('language', 'Not detected'),
+            'topics': topics_str,
+            'created_at': metadata.get('created_at', 'Unknown'),
+            'updated_at': metadata.get('updated_at', 'Unknown'),
+            'default_branch': metadata.get('default_branch', 'main'),
+            'structure_summary': structure_summary
+        })
+        prompt = io.StringIO()
+        prompt.write(_ANALYSIS_PROMPT_TEMPLATE.format_map(fields))
+        
+        # File contents are the bulk of the prompt; write them in place rather
+        # than formatting a separate string and copying it into the template
+        self._write_file_contents(prompt, repo_data.get('file_contents', {}))
+        prompt.write('\n')
+        return prompt.getvalue()
+
+    def _call_ai_model(self, prompt: str, cache_namespace: Optional[str] = None,
+                       system_prompt: Optional[str] = None,
+                       json_opener: Optional[str] = None) -> Union[str, Dict[str, Any]]:
         """
         Call the selected AI model with proper error handling, retries, and rate limiting.
 
         Args:
             prompt (str): Input prompt for the AI model
+            cache_namespace (str, optional): Kind of call; when given, the response
+                may be served from the semantic cache (if enabled). Callers store
+                replies they parsed with _store_semantic_response()
+            system_prompt (str, optional): Invariant instructions sent ahead of the
+                prompt as a system message, marked as a prompt-cache breakpoint
+                for Claude models
+            json_opener (str, optional): '{' or '[' when the caller only needs the
+                first JSON object or array of the reply; the response is then
+                streamed and cut off as soon as that value is complete
             
         Returns:
             Union[str, Dict[str, Any]]: AI response text or error information
@@ -1819,26 +3630,92 @@ Base your analysis on the actual files and structure provided, not generic assum
             AIModelError: If all retry attempts fail
             
         Note:
-            Implements exponential backoff for retries and handles various
-            API error conditions gracefully.
+            Implements jittered exponential backoff for retries and handles various
+            API error conditions gracefully. If the endpoint rejects streaming
+            requests, later calls use plain requests instead.
         """
         
         model_name = Constants.MODEL_NAME_MAP.get(self.model, Constants.MODEL_NAME_MAP[Constants.DEFAULT_MODEL])
         
-        for attempt in range(Constants.AI_MAX_RETRIES):
+        messages = self._build_messages(prompt, system_prompt)
+        
+        # Identical calls within this process reuse the earlier response
+        memo_key = self._ai_response_digest(prompt, system_prompt)
+        memoized = self._ai_memo.get(memo_key)
+        if memoized is not None:
+            self._ai_memo.move_to_end(memo_key)
+            logger.debug(f"Reusing in-memory response from {model_name}")
+            return memoized
+        
+        # Identical calls from earlier runs are answered from the disk cache; only
+        # replies a caller parsed successfully are stored there (_persist_ai_response)
+        disk_key = self._ai_response_disk_key(memo_key)
+        if disk_key:
+            stored = self.cache.get(disk_key)
+            if stored is not None:
+                content = stored.decode('utf-8')
+                logger.info(f"Reusing cached response from {model_name}")
+                self._remember_ai_response(memo_key, content)
+                return content
+        
+        embedding = None
+        if cache_namespace and self.llm_cache:
+            cached_response, embedding = self.llm_cache.get(cache_namespace, model_name, prompt)
+            if cached_response is not None:
+                self._remember_ai_response(memo_key, cached_response)
+                return cached_response
+            if embedding is not None:
+                # Kept for _store_semantic_response, so storing a parsed reply
+                # does not embed the prompt a second time
+                self._pending_embeddings[memo_key] = embedding
+                while len(self._pending_embeddings) > Constants.AI_MEMO_MAX_ENTRIES:
+                    self._pending_embeddings.pop(next(iter(self._pending_embeddings)))
+        
+        max_retries = Constants.AI_MAX_RETRIES
+        retry_delay = Constants.AI_RETRY_DELAY
+        wait_time = retry_delay
+        create = self.client.chat.completions.create
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
+        for attempt in range(max_retries):
             try:
-                logger.debug(f"Calling AI model {model_name} (attempt {attempt + 1}/{Constants.AI_MAX_RETRIES})")
+                if debug_enabled:
+                    logger.debug(f"Calling AI model {model_name} (attempt {attempt + 1}/{max_retries})")
+                
+                streaming_rejected = False
+                if json_opener and self._ai_streaming:
+                    try:
+                        content = self._stream_json_response(model_name, messages, json_opener)
+                    except self._bad_request_error as e:
+                        # Could also be a 400 for the prompt itself; the plain request
+                        # below tells the two apart within this same attempt
+                        logger.info(f"Streaming rejected by {model_name}, retrying without streaming: {e}")
+                        streaming_rejected = True
+                    else:
+                        if not content:
+                            raise AIModelError("AI model returned empty response")
+                        logger.info(f"AI model {model_name} responded successfully")
+                        self._remember_ai_response(memo_key, content)
+                        return content
                 
                 # Prepare request with timeout and proper parameters
-                response = self.client.chat.completions.create(
+                response = create(
                     model=model_name,
-                    messages=[{"role": "user", "content": prompt}]
+                    messages=messages
                 )
                 
+                # Only a 400 that the plain request avoids means streaming is unsupported
+                if streaming_rejected:
+                    logger.info(f"Plain request to {model_name} succeeded; not streaming for the rest of the run")
+                    self._ai_streaming = False
+                
                 # Extract response content
-                if response.choices and len(response.choices) > 0:
+                if response.choices:
                     content = response.choices[0].message.content
                     logger.info(f"AI model {model_name} responded successfully")
+                    self._log_prompt_cache_usage(response)
+                    if isinstance(content, str):
+                        self._remember_ai_response(memo_key, content)
                     return content
                 else:
                     raise AIModelError("AI model returned empty response")
@@ -1854,18 +3731,181 @@ Base your analysis on the actual files and structure provided, not generic assum
                     raise AIModelError(f"Authentication failed for {self.model}: {e}")
                 
                 # If this is the last attempt, raise the exception
-                if attempt == Constants.AI_MAX_RETRIES - 1:
-                    logger.error(f"All {Constants.AI_MAX_RETRIES} AI model attempts failed")
-                    raise AIModelError(f"AI model {model_name} failed after {Constants.AI_MAX_RETRIES} attempts: {e}")
+                if attempt == max_retries - 1:
+                    logger.error(f"All {max_retries} AI model attempts failed")
+                    raise AIModelError(f"AI model {model_name} failed after {max_retries} attempts: {e}")
                 
-                # Wait before retrying with exponential backoff
-                wait_time = Constants.AI_RETRY_DELAY * (2 ** attempt)
-                logger.info(f"Waiting {wait_time} seconds before retry...")
+                # Wait before retrying; decorrelated jitter keeps concurrent
+                # analyses from retrying against the provider in lockstep
+                wait_time = min(Constants.AI_RETRY_DELAY_CAP, random.uniform(retry_delay, wait_time * 3))
+                logger.info(f"Waiting {wait_time:.1f} seconds before retry...")
                 time.sleep(wait_time)
         
         # Should never reach here due to exception handling above
         raise AIModelError("Unexpected error in AI model call")
 
+    def _stream_json_response(self, model_name: str, messages: List[Dict[str, Any]], json_opener: str) -> str:
+        """
+        Stream a completion and stop once its first JSON value has closed.
+
+        Args:
+            model_name (str): Provider model name
+            messages (List[Dict[str, Any]]): Chat messages
+            json_opener (str): '{' or '[', the start of the expected JSON value
+
+        Returns:
+            str: Response text up to and including the end of the JSON value, or
+            the whole response if no complete value appeared
+        """
+        stream = self.client.chat.completions.create(
+            model=model_name,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        scanner = JsonBoundaryScanner(json_opener)
+        parts = []
+        try:
+            for chunk in stream:
+                if getattr(chunk, 'usage', None):
+                    self._log_prompt_cache_usage(chunk)
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if not text:
+                    continue
+                end = scanner.feed(text)
+                if end != -1:
+                    # Whatever the model writes after the JSON is not needed
+                    parts.append(text[:end])
+                    logger.debug(f"Closed {model_name} stream at the end of the JSON value")
+                    break
+                parts.append(text)
+        finally:
+            stream.close()
+        return ''.join(parts)
+
+    def _ai_response_digest(self, prompt: str, system_prompt: Optional[str]) -> bytes:
+        """
+        Hash the model name and messages of an AI call.
+
+        Args:
+            prompt (str): Per-request prompt text
+            system_prompt (str, optional): Invariant instructions sent with the call
+
+        Returns:
+            bytes: Digest keying the in-process memo and the response disk cache
+        """
+        model_name = Constants.MODEL_NAME_MAP.get(self.model, Constants.MODEL_NAME_MAP[Constants.DEFAULT_MODEL])
+        return hashlib.blake2b(
+            f"{model_name}\0{system_prompt or ''}\0{prompt}".encode('utf-8'), digest_size=16
+        ).digest()
+
+    def _ai_response_disk_key(self, digest: bytes) -> Optional[str]:
+        """
+        Build the disk cache key for a raw AI response.
+
+        Args:
+            digest (bytes): Digest from _ai_response_digest()
+
+        Returns:
+            Optional[str]: Cache key, or None if the cache or enable_ai_cache is off
+        """
+        if not self.cache or not self.config.get('enable_ai_cache', True):
+            return None
+        return f"ai/responses/{digest.hex()}.txt"
+
+    def _persist_ai_response(self, prompt: str, system_prompt: Optional[str], content: str) -> None:
+        """
+        Store an AI response on disk for later runs once it has been parsed.
+
+        Args:
+            prompt (str): Per-request prompt text
+            system_prompt (str, optional): Invariant instructions sent with the call
+            content (str): Response text returned by _call_ai_model()
+
+        Note:
+            Called by the caller after the reply parsed successfully, so a
+            truncated or malformed answer is never replayed by later runs.
+        """
+        disk_key = self._ai_response_disk_key(self._ai_response_digest(prompt, system_prompt))
+        if disk_key:
+            self.cache.set(disk_key, content.encode('utf-8'))
+
+    def _store_semantic_response(self, cache_namespace: str, prompt: str,
+                                 system_prompt: Optional[str], content: str) -> None:
+        """
+        Store an AI response in the semantic cache once it has been parsed.
+
+        Args:
+            cache_namespace (str): Kind of call, as passed to _call_ai_model()
+            prompt (str): Per-request prompt text
+            system_prompt (str, optional): Invariant instructions sent with the call
+            content (str): Response text returned by _call_ai_model()
+
+        Note:
+            Like _persist_ai_response(), only called after a successful parse, so
+            a malformed reply is neither replayed nor matched by similar prompts.
+        """
+        embedding = self._pending_embeddings.pop(self._ai_response_digest(prompt, system_prompt), None)
+        if self.llm_cache:
+            model_name = Constants.MODEL_NAME_MAP.get(self.model, Constants.MODEL_NAME_MAP[Constants.DEFAULT_MODEL])
+            self.llm_cache.put(cache_namespace, model_name, prompt, content, embedding)
+
+    def _remember_ai_response(self, key: bytes, content: str) -> None:
+        """
+        Store an AI response in the in-process memo, evicting the least recently used.
+
+        Args:
+            key (bytes): Digest of the model name and messages
+            content (str): Response text
+        """
+        self._ai_memo[key] = content
+        self._ai_memo.move_to_end(key)
+        while len(self._ai_memo) > Constants.AI_MEMO_MAX_ENTRIES:
+            self._ai_memo.popitem(last=False)
+
+    def _build_messages(self, prompt: str, system_prompt: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Build the chat messages for a model call.
+
+        Args:
+            prompt (str): Per-request prompt text
+            system_prompt (str, optional): Invariant instructions placed first
+
+        Returns:
+            List[Dict[str, Any]]: Messages for chat.completions.create
+
+        Note:
+            Providers cache exact prompt prefixes, so the fixed system prompt goes
+            first. Claude models need an explicit ephemeral cache_control marker;
+            OpenAI-style models cache long prefixes automatically.
+        """
+        if not system_prompt:
+            return [{"role": "user", "content": prompt}]
+        
+        system_part = {"type": "text", "text": system_prompt}
+        if self.model.startswith('claude'):
+            system_part["cache_control"] = {"type": "ephemeral"}
+        return [
+            {"role": "system", "content": [system_part]},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def _log_prompt_cache_usage(response: Any) -> None:
+        """
+        Log how many prompt tokens were served from the provider's prompt cache.
+
+        Args:
+            response (Any): Chat completion response
+        """
+        usage = getattr(response, 'usage', None)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', None)
+        if cached_tokens is not None:
+            logger.info(f"Prompt cache: {cached_tokens}/{getattr(usage, 'prompt_tokens', '?')} prompt tokens cached")
+
     def save_analysis_result(self, analysis_result: Dict[str, Any], owner: str, repo: str) -> str:
         """
         Save analysis result to a structured output file with proper error handling.
@@ -1881,19 +3921,23 @@ Base your analysis on the actual files and structure provided, not generic assum
         Note:
             Creates directory structure if needed and handles file write errors gracefully.
         """
+        payload: Optional[bytes] = None
         try:
-            # Create output directory structure
+            # Create output directory structure (once per process)
             output_dir = Path(owner)
-            output_dir.mkdir(parents=True, exist_ok=True)
+            _ensure_directory(output_dir)
             
-            # Generate filename with timestamp for uniqueness
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_filename = f"{repo}_{timestamp}.json"
+            # Generate filename with timestamp and process id for uniqueness across
+            # concurrent workers finishing in the same second
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            output_filename = f"{repo}_{timestamp}_{os.getpid()}.json"
             output_path = output_dir / output_filename
             
+            # Serialize once; the timestamped file and the "latest" copy share the bytes
+            payload = _json_dumps_bytes(analysis_result, indent=True)
+            
             # Write analysis result with pretty formatting
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(analysis_result, f, indent=2, ensure_ascii=False, sort_keys=False)
+            output_path.write_bytes(payload)
             
             logger.info(f"Analysis result saved to: {output_path}")
             
@@ -1902,9 +3946,14 @@ Base your analysis on the actual files and structure provided, not generic assum
             try:
                 if latest_path.exists():
                     latest_path.unlink()
-                # Create a copy rather than symlink for Windows compatibility
-                with open(latest_path, 'w', encoding='utf-8') as f:
-                    json.dump(analysis_result, f, indent=2, ensure_ascii=False, sort_keys=False)
+                # Hard link shares the bytes without copying, so the timestamped
+                # file is the only data written and there is no second write to
+                # overlap; fall back to a plain copy (not a symlink) where links
+                # are unsupported, e.g. on Windows
+                try:
+                    os.link(output_path, latest_path)
+                except (OSError, AttributeError):
+                    latest_path.write_bytes(payload)
                 logger.debug(f"Latest analysis link created: {latest_path}")
             except Exception as e:
                 logger.warning(f"Could not create latest analysis link: {e}")
@@ -1916,8 +3965,10 @@ Base your analysis on the actual files and structure provided, not generic assum
             # Fallback: try to save in current directory
             try:
                 fallback_path = Path(f"{owner}_{repo}_analysis.json")
-                with open(fallback_path, 'w', encoding='utf-8') as f:
-                    json.dump(analysis_result, f, indent=2, ensure_ascii=False)
+                # Reuse the bytes if serialization succeeded before the write failed
+                if payload is None:
+                    payload = _json_dumps_bytes(analysis_result, indent=True)
+                fallback_path.write_bytes(payload)
                 logger.info(f"Analysis saved to fallback location: {fallback_path}")
                 return str(fallback_path)
             except Exception as fallback_error:
@@ -1925,10 +3976,51 @@ Base your analysis on the actual files and structure provided, not generic assum
                 raise RepositoryAnalyzerError(f"Could not save analysis result: {e}")
 
 
-def validate_environment() -> Dict[str, Any]:
+# Import name -> distribution name of the packages the analyzer may need
+_PACKAGE_DISTRIBUTIONS = {'requests': 'requests', 'openai': 'openai', 'toml': 'toml', 'yaml': 'PyYAML'}
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_packages(packages: Tuple[str, ...]) -> Tuple[Tuple[Tuple[str, str], ...], Tuple[str, ...]]:
+    """
+    Look up installed versions of packages.
+
+    Args:
+        packages (Tuple[str, ...]): Import names, keys of _PACKAGE_DISTRIBUTIONS
+
+    Returns:
+        Tuple: ((package, version) pairs for installed packages, names of missing packages)
+
+    Note:
+        Packages are located without importing them (config parsers are loaded on
+        demand). Installed packages do not change during a run, so the probe is
+        done once per process. It takes a few milliseconds, about what reading
+        a cached result back from disk would cost, so it is not persisted.
+    """
+    found = []
+    missing = []
+    for package in packages:
+        if importlib.util.find_spec(package) is None:
+            missing.append(package)
+            continue
+        try:
+            version = importlib.metadata.version(_PACKAGE_DISTRIBUTIONS[package])
+        except importlib.metadata.PackageNotFoundError:
+            version = 'unknown'
+        found.append((package, version))
+    return tuple(found), tuple(missing)
+
+
+def validate_environment(use_ai: bool = True, config_file: Optional[str] = None) -> Dict[str, Any]:
     """
     Validate the runtime environment and check for required dependencies.
     
+    Args:
+        use_ai (bool): Whether the run makes AI calls; without them neither the
+            AI API key nor the openai package is required
+        config_file (str, optional): Configuration file of the run; a TOML or
+            YAML file makes its parser a required package
+    
     Returns:
         Dict[str, Any]: Environment validation results
         
@@ -1944,15 +4036,18 @@ def validate_environment() -> Dict[str, Any]:
         'errors': []
     }
     
-    # Check required packages
-    required_packages = ['requests', 'openai', 'toml', 'yaml']
-    for package in required_packages:
-        try:
-            module = __import__(package)
-            version = getattr(module, '__version__', 'unknown')
-            validation_results['required_packages'][package] = version
-        except ImportError:
-            validation_results['errors'].append(f"Required package '{package}' not found")
+    # Check required packages (probed once per process). The config parsers are
+    # only needed for their own file format, and tomllib covers TOML on 3.11+
+    required_packages = ['requests', 'openai'] if use_ai else ['requests']
+    config_extension = Path(config_file).suffix.lower() if config_file else ''
+    if config_extension == '.toml' and sys.version_info < (3, 11):
+        required_packages.append('toml')
+    elif config_extension in ('.yml', '.yaml'):
+        required_packages.append('yaml')
+    found_packages, missing_packages = _probe_packages(tuple(required_packages))
+    validation_results['required_packages'].update(found_packages)
+    for package in missing_packages:
+        validation_results['errors'].append(f"Required package '{package}' not found")
     
     # Check environment variables
     env_vars_to_check = [
@@ -1966,7 +4061,7 @@ def validate_environment() -> Dict[str, Any]:
 
     # Check if AI API key is available
     ai_key_available = bool(os.getenv(Constants.AI_API_KEY_ENV))
-    if not ai_key_available:
+    if use_ai and not ai_key_available:
         validation_results['errors'].append(f"AI API key not found. Please set {Constants.AI_API_KEY_ENV} environment variable")
     
     # GitHub token warning
@@ -1978,9 +4073,8 @@ def validate_environment() -> Dict[str, Any]:
     return validation_results
 
 
-def print_usage():
-    """Print comprehensive usage information and examples."""
-    usage_text = f"""
+# Usage text, rendered once at import; only the program name is filled in per call
+_USAGE_TEXT = f"""
 {Constants.APP_NAME} v{Constants.APP_VERSION}
 {'-' * (len(Constants.APP_NAME) + len(Constants.APP_VERSION) + 3)}
 
@@ -1990,7 +4084,8 @@ DESCRIPTION:
     and handles complex project structures including monorepos.
 
 USAGE:
-    python {sys.argv[0]} <github_repo_url> [model] [config_file]
+    python {{prog}} <github_repo_url> [model] [config_file]
+    python {{prog}} <github_repo_url> [--model MODEL] [--config CONFIG_FILE] [--no-ai]
 
 ARGUMENTS:
     github_repo_url    GitHub repository URL (required)
@@ -1998,21 +4093,29 @@ ARGUMENTS:
                                https://github.com/owner/repo.git
                                git@github.com:owner/repo.git
 
-    model             AI model to use (optional, default: {Constants.DEFAULT_MODEL})
+    model, --model    AI model to use (optional, default: {Constants.DEFAULT_MODEL})
                       Available models: {', '.join(Constants.MODEL_NAME_MAP.keys())}
 
-    config_file       Configuration file path (optional)
+    config_file,      Configuration file path (optional)
+    --config
                       Supported formats: .toml, .yaml/.yml, .json
 
+    --no-ai           Skip all AI calls: files and structure are chosen by
+                      heuristics and only the fetched context is saved.
+                      AI_API_KEY is not required
+
 EXAMPLES:
     # Basic analysis with default model
-    python {sys.argv[0]} https://github.com/facebook/react
+    python {{prog}} https://github.com/facebook/react
 
     # Use specific AI model
-    python {sys.argv[0]} https://github.com/microsoft/vscode claude-opus
+    python {{prog}} https://github.com/microsoft/vscode claude-opus
 
     # Use custom configuration
-    python {sys.argv[0]} https://github.com/google/go gpt-4 my_config.toml
+    python {{prog}} https://github.com/google/go gpt-4 my_config.toml
+
+    # Fetch the repository context only, without AI
+    python {{prog}} https://github.com/facebook/react --no-ai
 
 ENVIRONMENT VARIABLES:
     Required:
@@ -2025,7 +4128,7 @@ ENVIRONMENT VARIABLES:
     AI_API_BASE_URL      Custom API base URL (default: https://llm.labs.blackduck.com)
 
 OUTPUT:
-    Analysis results are saved to: <owner>/<repo>_<timestamp>.json
+    Analysis results are saved to: <owner>/<repo>_<timestamp>_<pid>.json
     A latest copy is also saved as: <owner>/<repo>_latest.json
     Detailed logs are saved to: logs/repo_analyzer_<timestamp>.log
 
@@ -2048,71 +4151,189 @@ SUPPORT:
     Issues: https://github.com/SrinathAkkem/repo-analyzer/issues
     Documentation: https://docs.example.com/repo-analyzer
 """
-    print(usage_text)
+
+
+def print_usage():
+    """Print comprehensive usage information and examples."""
+    print(_USAGE_TEXT.format(prog=sys.argv[0]))
+
+
+class ExitCode(IntEnum):
+    """Process exit statuses of the command-line interface."""
+    OK = 0
+    USAGE = 1  # Invalid arguments or usage
+    CONFIG = 2  # Environment validation or configuration failed
+    ANALYSIS = 3  # Repository context or AI analysis failed
+    UNEXPECTED = 4  # Any other error
+    INTERRUPTED = 130  # Interrupted by the user (128 + SIGINT)
+    BROKEN_PIPE = 141  # Output reader went away (128 + SIGPIPE)
+
+
+def _exit(code: ExitCode) -> NoReturn:
+    """
+    Flush pending output and exit with the given status.
+
+    Args:
+        code (ExitCode): Exit status
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    raise SystemExit(int(code))
+
+
+def _handle_sigint(signum: int, frame: Optional[types.FrameType]) -> None:
+    """
+    SIGINT handler: the first interrupt unwinds normally, a second one exits at once.
+
+    Args:
+        signum (int): Signal number
+        frame (Optional[types.FrameType]): Interrupted stack frame
+
+    Note:
+        The first Ctrl-C raises KeyboardInterrupt so main() can report it and the
+        log queue is drained at exit. If unwinding stalls (e.g. waiting for fetch
+        worker threads still blocked in a GitHub or AI request), a second Ctrl-C
+        flushes stdio and terminates without running further cleanup.
+    """
+    if not getattr(_handle_sigint, 'interrupted', False):
+        _handle_sigint.interrupted = True
+        raise KeyboardInterrupt
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(int(ExitCode.INTERRUPTED))
+
+
+def _save_error_details(analyzer: UniversalRepoAnalyzer, details: Dict[str, Any], owner: str, repo: str) -> None:
+    """
+    Save a failed run's error information next to regular results.
+
+    Args:
+        analyzer (UniversalRepoAnalyzer): Analyzer that produced the error
+        details (Dict[str, Any]): Context or analysis dictionary carrying the 'error' key
+        owner (str): Repository owner
+        repo (str): Repository name
+
+    Note:
+        The regular save is attempted twice, then the details go to a file in
+        the system temp directory. Failing to save is reported but never masks
+        the original error.
+    """
+    for attempt in range(1, 3):
+        try:
+            error_output_path = analyzer.save_analysis_result(details, owner, repo)
+            print(f"💾 Error details saved to: {error_output_path}")
+            return
+        except RepositoryAnalyzerError as e:
+            logger.warning(f"Could not save error details (attempt {attempt}/2): {e}")
+    
+    try:
+        fd, error_output_path = tempfile.mkstemp(prefix=f"repo-analyzer-error-{owner}-{repo}-", suffix='.json')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_json_dumps_bytes(details, indent=True))
+        logger.info(f"Error details saved to temporary file: {error_output_path}")
+        print(f"💾 Error details saved to: {error_output_path}")
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not save error details to a temporary file: {e}")
 
 
 def main():
     """
     Main entry point for the Universal Repository Analyzer.
     
-    Handles command-line argument parsing, environment validation,
-    analysis orchestration, and output management.
+    Installs signal handling and runs the command-line interface.
     
     Exit Codes:
-        0: Success
-        1: Invalid arguments or usage
-        2: Environment validation failed  
-        3: Repository analysis failed
-        4: File I/O error
+        See ExitCode: 0 success, 1 usage, 2 environment/configuration,
+        3 analysis, 4 unexpected error, 130 interrupted, 141 broken pipe
+    """
+    signal.signal(signal.SIGINT, _handle_sigint)
+    try:
+        _run_cli()
+    except BrokenPipeError:
+        # Output piped into e.g. `head` that exited early. Point stdout at devnull
+        # (also used by the console log handler) so later writes do not raise again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        logger.info("Output pipe closed by reader")
+        _exit(ExitCode.BROKEN_PIPE)
+
+
+def _run_cli() -> None:
+    """
+    Run the command-line interface.
+    
+    Handles command-line argument parsing, environment validation,
+    analysis orchestration, and output management.
     """
-    # Print banner
-    print(f"\n{Constants.APP_NAME} v{Constants.APP_VERSION}")
-    print(f"{'=' * (len(Constants.APP_NAME) + len(Constants.APP_VERSION) + 3)}")
-    print(f"Author: {__author__}")
-    print(f"License: {__license__}")
-    print()
-
-    # Check arguments
-    if len(sys.argv) < 2:
-        print("❌ Error: Repository URL is required\n")
+    # Print banner (consecutive lines are written with a single print call).
+    # Status output stays on print rather than raw os.write(1, ...): writing
+    # past sys.stdout would reorder it against text still sitting in that
+    # buffer, and the batched prints already cost one write each
+    print(f"\n{Constants.APP_NAME} v{Constants.APP_VERSION}\n"
+          f"{'=' * (len(Constants.APP_NAME) + len(Constants.APP_VERSION) + 3)}\n"
+          f"Author: {__author__}\n"
+          f"License: {__license__}\n")
+
+    # Help is answered from raw argv, before a parser is built
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help', 'help'):
         print_usage()
-        sys.exit(1)
+        _exit(ExitCode.OK)
+
+    # Parse command line arguments; positional model/config_file are kept for
+    # existing callers, the options allow naming them explicitly
+    import argparse
+    parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]), add_help=False)
+    parser.add_argument('repo_url', nargs='?')
+    parser.add_argument('model', nargs='?')
+    parser.add_argument('config_file', nargs='?')
+    parser.add_argument('--model', dest='model_option')
+    parser.add_argument('--config', dest='config_option')
+    parser.add_argument('--no-ai', action='store_true')
+    args, unknown = parser.parse_known_intermixed_args()
     
-    if sys.argv[1] in ['-h', '--help', 'help']:
+    if not args.repo_url:
+        print("❌ Error: Repository URL is required\n", file=sys.stderr)
         print_usage()
-        sys.exit(0)
-
-    # Parse command line arguments
-    repo_url = sys.argv[1]
-    model = sys.argv[2] if len(sys.argv) > 2 else Constants.DEFAULT_MODEL
-    config_file = sys.argv[3] if len(sys.argv) > 3 else None
-
-    # Validate environment
+        _exit(ExitCode.USAGE)
+    
+    if unknown:
+        print(f"❌ Error: Unrecognized arguments: {' '.join(unknown)}\n", file=sys.stderr)
+        print_usage()
+        _exit(ExitCode.USAGE)
+    
+    repo_url = args.repo_url
+    model = args.model_option or args.model or Constants.DEFAULT_MODEL
+    config_file = args.config_option or args.config_file
+    use_ai = not args.no_ai
+
+    # Validate environment. This is a few milliseconds of local checks with no
+    # network I/O, so it runs up front rather than alongside the context fetch:
+    # a missing API key then fails before any GitHub request is made
     print("🔍 Validating environment...")
-    env_validation = validate_environment()
+    env_validation = validate_environment(use_ai=use_ai, config_file=config_file)
+    errors, warnings = env_validation['errors'], env_validation['warnings']
     
-    if env_validation['errors']:
-        print("❌ Environment validation failed:")
-        for error in env_validation['errors']:
-            print(f"   • {error}")
-        sys.exit(2)
+    if errors:
+        print("❌ Environment validation failed:\n" + '\n'.join(f"   • {error}" for error in errors),
+              file=sys.stderr)
+        _exit(ExitCode.CONFIG)
     
-    if env_validation['warnings']:
-        print("⚠️  Environment warnings:")
-        for warning in env_validation['warnings']:
-            print(f"   • {warning}")
+    if warnings:
+        print("⚠️  Environment warnings:\n" + '\n'.join(f"   • {warning}" for warning in warnings))
     
-    print("✅ Environment validation passed")
-    print(f"📝 Log file: {log_file_path}")
-    print()
+    print(f"✅ Environment validation passed\n📝 Log file: {log_file_path}\n")
 
     try:
         # Initialize analyzer
-        print(f"🚀 Initializing analyzer with model: {model}")
+        if use_ai:
+            print(f"🚀 Initializing analyzer with model: {model}")
+        else:
+            print("🚀 Initializing analyzer without AI (--no-ai)")
         if config_file:
             print(f"📋 Using configuration file: {config_file}")
         
-        analyzer = UniversalRepoAnalyzer(model=model, config_file=config_file)
+        analyzer = UniversalRepoAnalyzer(model=model, config_file=config_file, use_ai=use_ai)
         
         # Fetch repository context
         print(f"🔄 Analyzing repository: {repo_url}")
@@ -2121,81 +4342,99 @@ def main():
         context = analyzer.get_full_repository_context(repo_url)
         
         if 'error' in context:
-            print(f"❌ Failed to fetch repository context: {context['error']}")
-            
-            # Save error information
-            try:
-                error_output_path = analyzer.save_analysis_result(context, 
-                    context.get('owner', 'unknown'), 
-                    context.get('repo', 'unknown'))
-                print(f"💾 Error details saved to: {error_output_path}")
-            except Exception:
-                pass
+            # The analyzer has already logged the full error; keep stdout free of it
+            print(f"❌ Failed to fetch repository context (details in {log_file_path})", file=sys.stderr)
             
-            sys.exit(3)
+            _save_error_details(analyzer, context, context.get('owner', 'unknown'), context.get('repo', 'unknown'))
+            _exit(ExitCode.ANALYSIS)
+        
+        owner, repo = context['owner'], context['repo']
         
-        print(f"✅ Repository context fetched:")
-        print(f"   └── {context['total_files']} total files")
-        print(f"   └── {context['analyzed_files']} files analyzed in detail")
+        print(f"✅ Repository context fetched:\n"
+              f"   └── {context['total_files']} total files\n"
+              f"   └── {context['analyzed_files']} files analyzed in detail")
         
-        # Perform AI analysis
-        print("🧠 Performing AI analysis...")
-        analysis = analyzer.analyze_with_ai(context)
+        if use_ai:
+            # Perform AI analysis
+            print("🧠 Performing AI analysis...")
+            analysis = analyzer.analyze_with_ai(context)
+        else:
+            # Context only: what was fetched and the heuristic structure analysis
+            print("⏭️  Skipping AI analysis (--no-ai)")
+            analysis = {
+                'context_only': True,
+                'metadata': context['metadata'],
+                'structure': context['structure'],
+                'total_files': context['total_files'],
+                'analyzed_files': list(context['file_contents']),
+                'analysis_timestamp': context['analysis_timestamp'],
+                'analyzer_version': context['analyzer_version']
+            }
         
         if 'error' in analysis:
-            print(f"❌ AI analysis failed: {analysis['error']}")
+            print(f"❌ AI analysis failed: {analysis['error']} (details in {log_file_path})", file=sys.stderr)
             
-            # Save error information
-            try:
-                error_output_path = analyzer.save_analysis_result(analysis, context['owner'], context['repo'])
-                print(f"💾 Error details saved to: {error_output_path}")
-            except Exception:
-                pass
-                
-            sys.exit(3)
+            _save_error_details(analyzer, analysis, owner, repo)
+            _exit(ExitCode.ANALYSIS)
         
         # Save results
         print("💾 Saving analysis results...")
-        output_path = analyzer.save_analysis_result(analysis, context['owner'], context['repo'])
-        
-        # Print success summary
-        print("\n🎉 Analysis completed successfully!")
-        print(f"📊 Results saved to: {output_path}")
-        print(f"📈 Repository: {context['owner']}/{context['repo']}")
-        print(f"🔧 Model used: {analyzer.model}")
-        
-        # Print key insights if available
-        if 'repository_analysis' in analysis:
-            repo_analysis = analysis['repository_analysis']
-            print(f"🏗️  Architecture: {repo_analysis.get('architecture_type', 'Unknown')}")
-            print(f"💻 Primary tech: {repo_analysis.get('primary_technology', 'Unknown')}")
-            if 'technology_stack' in repo_analysis and repo_analysis['technology_stack']:
-                tech_count = len(repo_analysis['technology_stack'])
-                print(f"🛠️  Technologies: {tech_count} identified")
-        
-        # Print JSON output for programmatic consumption
-        print("\n" + "="*60)
-        print(json.dumps(analysis, indent=2, ensure_ascii=False))
+        output_path = analyzer.save_analysis_result(analysis, owner, repo)
+        
+        # Print success summary, collected and written in one go
+        summary = [
+            "\n🎉 Analysis completed successfully!",
+            f"📊 Results saved to: {output_path}",
+            f"📈 Repository: {owner}/{repo}",
+            f"🔧 Model used: {analyzer.model}" if use_ai else "🔧 Model used: none (--no-ai)"
+        ]
+        
+        # Add key insights if available
+        repo_analysis = analysis.get('repository_analysis')
+        if repo_analysis is not None:
+            summary.extend((
+                f"🏗️  Architecture: {repo_analysis.get('architecture_type', 'Unknown')}",
+                f"💻 Primary tech: {repo_analysis.get('primary_technology', 'Unknown')}"
+            ))
+            technology_stack = repo_analysis.get('technology_stack')
+            if technology_stack:
+                summary.append(f"🛠️  Technologies: {len(technology_stack)} identified")
+        
+        # Separator before the JSON output for programmatic consumption
+        summary.append("\n" + "="*60)
+        print('\n'.join(summary))
+        stdout_buffer = getattr(sys.stdout, 'buffer', None)
+        if stdout_buffer is not None:
+            # UTF-8 bytes go straight to the binary layer, skipping a str copy
+            sys.stdout.flush()
+            stdout_buffer.write(_json_dumps_bytes(analysis, indent=True))
+            stdout_buffer.write(b'\n')
+            stdout_buffer.flush()
+        else:
+            print(_json_dumps(analysis, indent=True))
         
     except KeyboardInterrupt:
-        print("\n\n⚠️  Analysis interrupted by user")
+        print("\n\n⚠️  Analysis interrupted by user", file=sys.stderr)
         logger.info("Analysis interrupted by user (KeyboardInterrupt)")
-        sys.exit(1)
+        _exit(ExitCode.INTERRUPTED)
         
     except ConfigurationError as e:
-        print(f"❌ Configuration error: {e}")
+        print(f"❌ Configuration error: {e}", file=sys.stderr)
         logger.error(f"Configuration error: {e}")
-        sys.exit(2)
+        _exit(ExitCode.CONFIG)
         
     except (GitHubAPIError, AIModelError) as e:
-        print(f"❌ Analysis error: {e}")
+        print(f"❌ Analysis error: {e}", file=sys.stderr)
         logger.error(f"Analysis error: {e}")
-        sys.exit(3)
+        _exit(ExitCode.ANALYSIS)
+        
+    except BrokenPipeError:
+        raise  # Handled in main()
         
     except Exception as e:
-        print(f"❌ Unexpected error: {e}")
         logger.error(f"Unexpected error: {e}", exc_info=True)
-        sys.exit(4)
+        print(f"❌ Unexpected error (traceback in {log_file_path})", file=sys.stderr)
+        _exit(ExitCode.UNEXPECTED)
 
 
 if __name__ == "__main__":
@@ -137,7 +137,7 @@ fi
 source "$VENV_DIR/bin/activate"
 
 # Install Python dependencies
-REQUIRED_PACKAGES=("requests>=2.31.0" "openai>=1.0.0" "toml>=0.10.2" "PyYAML>=6.0")
+REQUIRED_PACKAGES=("requests>=2.31.0" "openai>=1.0.0" "toml>=0.10.2" "PyYAML>=6.0" "orjson>=3.8" "pyahocorasick>=2.0")
 for pkg in "${REQUIRED_PACKAGES[@]}"; do
     if ! pip show "$(echo "$pkg" | cut -d'>' -f1)" >/dev/null 2>&1; then
         log "Installing $pkg..."